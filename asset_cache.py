@@ -0,0 +1,72 @@
+# asset_cache.py
+
+import base64
+import json
+import mimetypes
+import os
+import threading
+
+# Written by scrapers/crest_scraper.py: source URL -> locally stored original and thumbnail
+ASSET_MANIFEST = "./data/assets/manifest.json"
+
+mimetypes.add_type('image/svg+xml', '.svg')
+mimetypes.add_type('image/webp', '.webp')
+
+class AssetCache:
+    def __init__(self, manifest_path: str = ASSET_MANIFEST):
+        """
+        Serves crest and icon images from the local asset store as data URIs, so pages and PDF
+        reports embed them instead of fetching them from remote hosts. Encoded images are kept
+        in memory; the manifest is re-read whenever the scraper rewrites it.
+        """
+        self.manifest_path = manifest_path
+        self._manifest = {}
+        self._manifest_mtime = None
+        self._data_uris = {}  # (path, mtime) -> data URI
+        self._lock = threading.Lock()
+
+    def _load_manifest(self) -> dict:
+        try:
+            mtime = os.stat(self.manifest_path).st_mtime_ns
+        except FileNotFoundError:
+            return {}
+        if mtime != self._manifest_mtime:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                self._manifest = json.load(f)
+            self._manifest_mtime = mtime
+        return self._manifest
+
+    def local_path(self, url: str, thumbnail: bool = True) -> str | None:
+        """Path of the stored copy of an asset URL (its thumbnail by default), if it was downloaded."""
+        with self._lock:
+            entry = self._load_manifest().get(url)
+        if not entry:
+            return None
+        file_name = entry.get('thumbnail' if thumbnail else 'file') or entry.get('file')
+        path = os.path.join(os.path.dirname(self.manifest_path), file_name)
+        return path if os.path.exists(path) else None
+
+    def inline(self, url: str, thumbnail: bool = True) -> str:
+        """The asset as a data URI, or the URL itself if there is no local copy."""
+        if not isinstance(url, str) or url.startswith('data:'):
+            return url
+        path = self.local_path(url, thumbnail)
+        if path is None:
+            return url
+
+        cache_key = (path, os.stat(path).st_mtime_ns)
+        with self._lock:
+            data_uri = self._data_uris.get(cache_key)
+        if data_uri is None:
+            mime_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+            with open(path, 'rb') as f:
+                data_uri = f"data:{mime_type};base64,{base64.b64encode(f.read()).decode('ascii')}"
+            with self._lock:
+                self._data_uris[cache_key] = data_uri
+        return data_uri
+
+# One cache per process, shared by pages, report templates and render workers
+_asset_cache = AssetCache()
+
+def inline_asset(url: str, thumbnail: bool = True) -> str:
+    return _asset_cache.inline(url, thumbnail)
@@ -0,0 +1,107 @@
+# club_registry.py
+
+import threading
+import pandas as pd
+from player_analyzer import name_key, normalize_text
+
+# --- Known clubs ---
+# The canonical (system) name of every club, as used in club profiles and event file names, with
+# its name on the official league site (crests), its Transfermarkt page (fixtures) and every other
+# spelling found in Wyscout and Transfermarkt exports. A club's id is its position in this table,
+# so new clubs are appended at the end. Accents, case and spacing never need their own alias.
+CLUBS = {
+    "Dinamo Bucuresti": {"official_name": "Dinamo Bucuresti", "transfermarkt": {"name": "fc-dinamo-1948", "id": "312"}, "aliases": ["FC Dinamo 1948"]},
+    "FCS Bucuresti": {"official_name": "Fcsb", "transfermarkt": {"name": "fcsb", "id": "301"}, "aliases": ["FCSB"]},
+    "Rapid Bucuresti": {"official_name": "Fc Rapid Bucuresti", "transfermarkt": {"name": "fc-rapid-1923", "id": "455"}, "aliases": ["FC Rapid 1923"]},
+    "Otelul": {"official_name": "Otelul Galati", "transfermarkt": {"name": "sc-otelul-galati", "id": "4959"}, "aliases": ["SC Otelul Galati"]},
+    "CFR Cluj": {"official_name": "Cfr Cluj", "transfermarkt": {"name": "cfr-cluj", "id": "7769"}, "aliases": []},
+    "Botosani": {"official_name": "Fc Botosani", "transfermarkt": {"name": "fc-botosani", "id": "8818"}, "aliases": []},
+    "Unirea Slobozia": {"official_name": "Unirea Slobozia", "transfermarkt": {"name": "afc-unirea-04-slobozia", "id": "29700"}, "aliases": ["AFC Unirea 04 Slobozia"]},
+    "Universitatea Craiova": {"official_name": "Universitatea Craiova", "transfermarkt": {"name": "cs-universitatea-craiova", "id": "40812"}, "aliases": ["CS Universitatea Craiova"]},
+    "UTA Arad": {"official_name": "Uta Arad", "transfermarkt": {"name": "uta-arad", "id": "952"}, "aliases": []},
+    "Hermannstadt": {"official_name": "Afc Hermannstadt", "transfermarkt": {"name": "fc-hermannstadt", "id": "58049"}, "aliases": ["FC Hermannstadt"]},
+    "Universitatea Cluj": {"official_name": "Fc Universitatea Cluj", "transfermarkt": {"name": "fc-universitatea-cluj", "id": "6429"}, "aliases": []},
+    "Petrolul 52": {"official_name": "Petrolul Ploiesti", "transfermarkt": {"name": "petrolul-ploiesti", "id": "9465"}, "aliases": []},
+    "Farul Constanta": {"official_name": "Fc Farul Constanta", "transfermarkt": {"name": "fcv-farul-constanta", "id": "29831"}, "aliases": ["FCV Farul Constanta"]},
+    "Poli Iasi": {"official_name": None, "transfermarkt": None, "aliases": ["Politehnica Iasi", "ACSM Politehnica Iasi"]},
+    "AS FC Buzau": {"official_name": None, "transfermarkt": None, "aliases": []},
+    "Sepsi": {"official_name": None, "transfermarkt": None, "aliases": ["Sepsi OSK Sf. Gheorghe"]},
+    "FC Arges": {"official_name": "Fc Arges", "transfermarkt": None, "aliases": ["ACSC FC Arges"]},
+    "Csikszereda Miercurea Ciuc": {"official_name": "Fk Csikszereda", "transfermarkt": None, "aliases": []},
+    "Metaloglobus Bucuresti": {"official_name": "Metaloglobus", "transfermarkt": None, "aliases": ["FC Metaloglobus Bucharest"]}
+}
+
+class ClubRegistry:
+    def __init__(self, clubs: dict = CLUBS):
+        """
+        Maps every known spelling of a club to one integer club id. Lookups never add clubs:
+        a name that matches no club has no id until it is added with register().
+        """
+        self.names = []           # club id -> canonical name
+        self.official_names = []  # club id -> name on the official league site (or None)
+        self.transfermarkt = []   # club id -> Transfermarkt page (or None)
+        self._alias_ids = {}      # name_key(alias) -> club id
+        self._lock = threading.Lock()
+
+        for canonical_name, club in clubs.items():
+            club_id = self._add(canonical_name, club.get('official_name'), club.get('transfermarkt'))
+            for alias in club.get('aliases', []) + [club.get('official_name')]:
+                if not alias:
+                    continue
+                known_id = self._alias_ids.setdefault(name_key(alias), club_id)
+                if known_id != club_id:
+                    raise ValueError(f"Alias '{alias}' of {canonical_name} already belongs to {self.names[known_id]}.")
+
+    def _add(self, canonical_name: str, official_name: str | None = None, transfermarkt: dict | None = None) -> int:
+        club_id = len(self.names)
+        self.names.append(canonical_name)
+        self.official_names.append(official_name)
+        self.transfermarkt.append(transfermarkt)
+        self._alias_ids[name_key(canonical_name)] = club_id
+        return club_id
+
+    def club_id(self, name: str) -> int | None:
+        """The id of the club a name refers to (None for missing or unknown names)."""
+        if not isinstance(name, str):
+            return None
+        return self._alias_ids.get(name_key(name))
+
+    def register(self, name: str) -> int | None:
+        """
+        The id of the club a name refers to, adding it as a new club (under its accent-stripped
+        spelling) if no club matches, e.g. a newly promoted team that is not in CLUBS yet.
+        """
+        if not isinstance(name, str):
+            return None
+        with self._lock:
+            club_id = self._alias_ids.get(name_key(name))
+            if club_id is None:
+                club_id = self._add(normalize_text(name))
+        return club_id
+
+    def resolve(self, names: pd.Series, register_unknown: bool = False) -> pd.Series:
+        """
+        Club ids for a whole column of names (NA for missing names, and for unknown names unless
+        register_unknown is set). Each distinct name is looked up once and the ids are spread back over the rows.
+        """
+        lookup = self.register if register_unknown else self.club_id
+        codes, unique_names = pd.factorize(names)
+        unique_ids = pd.array([lookup(name) for name in unique_names] + [None], dtype='Int32')
+        return pd.Series(unique_ids[codes], index=names.index, name='club_id')
+
+    def canonical_name(self, name: str) -> str | None:
+        """The system name of the club a name refers to, e.g. 'FCSB' -> 'FCS Bucuresti'."""
+        club_id = self.club_id(name)
+        return None if club_id is None else self.names[club_id]
+
+    def official_name(self, name: str) -> str | None:
+        """The name the official league site uses for a club (the key of the crest map)."""
+        club_id = self.club_id(name)
+        return None if club_id is None else self.official_names[club_id]
+
+    def transfermarkt_pages(self) -> dict:
+        """Canonical name -> Transfermarkt page slug and id, for every club that has one."""
+        return {name: page for name, page in zip(self.names, self.transfermarkt) if page}
+
+# One registry per process, shared by the pipeline, the pages and the scrapers
+CLUB_REGISTRY = ClubRegistry()
@@ -0,0 +1,128 @@
+# data_cache.py
+
+import hashlib
+import json
+import os
+import tempfile
+import pandas as pd
+
+try:
+    import pyarrow.feather as feather
+except ImportError:  # pyarrow is optional: without it every load is a plain CSV parse
+    feather = None
+
+DEFAULT_CACHE_DIR = './data/cache'
+
+# Fingerprints read_csv_cached has already taken in this process, by absolute source path
+_source_fingerprints = {}
+
+# The process umask (it can only be read by setting it), so written files get the usual permissions
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+def file_sha1(path: str) -> str:
+    """Hashes a file's contents in 1MB chunks."""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def file_fingerprint(path: str, known: dict | None = None) -> dict:
+    """
+    Identifies a version of a file by mtime, size and content hash. If a previously known
+    fingerprint has the same mtime and size, its hash is reused instead of re-reading the file.
+    """
+    stat = os.stat(path)
+    if known and known.get('mtime_ns') == stat.st_mtime_ns and known.get('size') == stat.st_size:
+        return known
+    return {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "sha1": file_sha1(path)}
+
+def temp_path_for(path: str) -> str:
+    """
+    A new, uniquely named file next to path, to write and then os.replace into place.
+    Concurrent writers of the same path each get their own, so none can publish another's partial file.
+    """
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path) or '.', prefix=os.path.basename(path) + '.', suffix='.tmp')
+    os.close(fd)
+    # mkstemp creates the file owner-only (0600); give it the mode a plain open() would
+    os.chmod(temp_path, 0o666 & ~_UMASK)
+    return temp_path
+
+def source_version(path: str) -> str:
+    """
+    Cheap identifier of a source file's version: the content hash read_csv_cached already took
+    when it loaded the file (if it is unchanged since), otherwise its mtime and size.
+    """
+    stat = os.stat(path)
+    known = _source_fingerprints.get(os.path.abspath(path))
+    if known and known['mtime_ns'] == stat.st_mtime_ns and known['size'] == stat.st_size:
+        return known['sha1']
+    return f"{stat.st_mtime_ns}:{stat.st_size}"
+
+def _cache_paths(csv_path: str, cache_dir: str, read_csv_kwargs: dict) -> tuple:
+    """
+    Cache file names depend on the source path, the read_csv options and the pandas version.
+    The options are serialized with sorted keys, so the name never depends on dict order.
+    """
+    options_key = json.dumps([os.path.abspath(csv_path), read_csv_kwargs, pd.__version__], sort_keys=True, default=str)
+    options_hash = hashlib.sha1(options_key.encode('utf-8')).hexdigest()[:12]
+    stem = os.path.splitext(os.path.basename(csv_path))[0]
+    cache_base = os.path.join(cache_dir, f"{stem}-{options_hash}")
+    return cache_base + '.feather', cache_base + '.json'
+
+def read_csv_cached(csv_path: str, cache_dir: str = DEFAULT_CACHE_DIR, **read_csv_kwargs) -> pd.DataFrame:
+    """
+    pd.read_csv backed by a typed, columnar (Feather) copy of the parsed result.
+    The copy is keyed by the source file's mtime and content hash, so it is rebuilt only when
+    the CSV changes; later loads memory-map it instead of parsing the CSV again.
+    """
+    if feather is None:
+        return pd.read_csv(csv_path, **read_csv_kwargs)
+
+    cache_path, meta_path = _cache_paths(csv_path, cache_dir, read_csv_kwargs)
+    cached_fingerprint = None
+    if os.path.exists(cache_path) and os.path.exists(meta_path):
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                cached_fingerprint = json.load(f)
+        except (OSError, ValueError) as e:
+            # A truncated or unreadable metadata file just means the copy has to be rebuilt
+            print(f"[WARN] Ignoring unreadable cache metadata {meta_path}: {e}")
+        if not isinstance(cached_fingerprint, dict) or 'sha1' not in cached_fingerprint:
+            cached_fingerprint = None
+
+    source_fingerprint = file_fingerprint(csv_path, known=cached_fingerprint)
+    _source_fingerprints[os.path.abspath(csv_path)] = source_fingerprint
+    if cached_fingerprint and source_fingerprint['sha1'] == cached_fingerprint['sha1']:
+        if source_fingerprint is not cached_fingerprint:
+            # Same contents, new mtime (e.g. the file was touched): just refresh the metadata
+            write_json_atomic(meta_path, source_fingerprint)
+        return feather.read_feather(cache_path, memory_map=True)
+
+    df = pd.read_csv(csv_path, **read_csv_kwargs)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        temp_path = temp_path_for(cache_path)
+        try:
+            # Uncompressed, so the file can be memory-mapped on the next load
+            feather.write_feather(df, temp_path, compression='uncompressed')
+            os.replace(temp_path, cache_path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        write_json_atomic(meta_path, source_fingerprint)
+    except (ValueError, TypeError, OSError) as e:
+        # Some frames (e.g. mixed-type object columns) can't be stored as Arrow; serve them uncached
+        print(f"[WARN] Could not cache {csv_path}: {e}")
+    return df
+
+def write_json_atomic(path: str, data: dict):
+    temp_path = temp_path_for(path)
+    try:
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        os.replace(temp_path, path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
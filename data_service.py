@@ -0,0 +1,83 @@
+# data_service.py
+
+import json
+import os
+import pandas as pd
+import streamlit as st
+from types import MappingProxyType
+from asset_cache import inline_asset
+from data_cache import DEFAULT_CACHE_DIR
+from match_finder import MatchFinder
+from player_analyzer import PlayerAnalyzer, PLAYERS_STATS_FILE, PLAYERS_PHYSICAL_FILE
+from talent_index import TalentIndex, TALENT_INDEX_FILE
+
+# --- Configuration ---
+PROFILES_FILE = './data/processed/club_profiles_final.json'
+CRESTS_FILE = './data/processed/club_crests.csv'
+
+class DataService:
+    def __init__(self, profiles_path: str = PROFILES_FILE, crests_path: str = CRESTS_FILE,
+                 stats_path: str = PLAYERS_STATS_FILE, physical_path: str = PLAYERS_PHYSICAL_FILE,
+                 cache_dir: str = DEFAULT_CACHE_DIR):
+        """
+        Owns the one PlayerAnalyzer, MatchFinder, club profile set, crest map and talent index
+        shared by every page and session of the app. Pages get read-only views, so nothing is
+        parsed twice and no page can change what another one sees.
+        If the player data files are missing, analyzer and finder are None and pages that need
+        them show their own message; profiles and crests are still served.
+        """
+        try:
+            self.analyzer = PlayerAnalyzer(stats_path=stats_path, physical_path=physical_path, cache_dir=cache_dir)
+        except FileNotFoundError as e:
+            print(f"❌ {e}")
+            self.analyzer = None
+        self.finder = MatchFinder(club_profiles_path=profiles_path, player_analyzer=self.analyzer) if self.analyzer else None
+
+        # The finder already parsed the profiles; share its copy instead of reading the JSON again
+        club_profiles = self.finder.club_profiles if self.finder else self._load_profiles(profiles_path)
+        self._club_profiles = MappingProxyType(club_profiles or {})
+        self._crest_dict = MappingProxyType(self._load_crests(crests_path))
+        # Every talent-finder ranking, reused from disk unless the profiles or player data changed
+        self.talent_index = TalentIndex.load_or_build(self.finder, TALENT_INDEX_FILE) if self.finder and self.finder.club_profiles else TalentIndex(None, {})
+        print("✅ DataService initialized.")
+
+    @staticmethod
+    def _load_profiles(profiles_path: str) -> dict:
+        """Club name -> profile, read directly when there is no finder to share them from."""
+        if not os.path.exists(profiles_path):
+            print(f"❌ ERROR: Club profiles file not found at {profiles_path}")
+            return {}
+        with open(profiles_path, 'r', encoding='utf-8') as f:
+            return {club['club_name']: club for club in json.load(f)}
+
+    @staticmethod
+    def _load_crests(crests_path: str) -> dict:
+        """Official club name -> crest, embedded from the local asset store when it has it."""
+        if not os.path.exists(crests_path):
+            print(f"[WARN] Crests file not found at {crests_path}; pages will use the placeholder crest.")
+            return {}
+        crests_df = pd.read_csv(crests_path)
+        return {name: inline_asset(url) for name, url in zip(crests_df.club_name_official, crests_df.crest_url)}
+
+    @property
+    def club_profiles(self) -> MappingProxyType:
+        """Club name -> profile (read-only)."""
+        return self._club_profiles
+
+    @property
+    def crest_dict(self) -> MappingProxyType:
+        """Official club name -> crest URL or data URI (read-only)."""
+        return self._crest_dict
+
+    @property
+    def players_df(self) -> pd.DataFrame | None:
+        """
+        The analyzer's de-duplicated player table (None without player data). A shallow copy,
+        so a page adding or replacing columns doesn't touch the shared frame.
+        """
+        return self.analyzer.players_df.copy(deep=False) if self.analyzer else None
+
+@st.cache_resource
+def get_data_service() -> DataService:
+    """The process-wide DataService, built on first use."""
+    return DataService()
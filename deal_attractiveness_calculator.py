@@ -1,5 +1,19 @@
 # deal_attractiveness_calculator.py (Final Version with Disruption Score)
 
+import pandas as pd
+from financials import get_net_spend_eur
+
+class LeagueContext:
+    """
+    League-wide inputs for the attractiveness score, computed once per league instead of once per club:
+    the min/max squad depth and age used for normalization, plus every club's financial and disruption score.
+    """
+    def __init__(self, min_depth, max_depth, min_age, max_age, financial_scores: dict, disruption_scores: dict):
+        self.min_depth, self.max_depth = min_depth, max_depth
+        self.min_age, self.max_age = min_age, max_age
+        self.financial_scores = financial_scores
+        self.disruption_scores = disruption_scores
+
 class DealAttractivenessCalculator:
     def __init__(self):
         # --- THE FIX IS HERE: New, re-balanced weights ---
@@ -18,36 +32,57 @@ class DealAttractivenessCalculator:
             return 50 
         return 100 * (value - min_val) / (max_val - min_val)
 
-    def calculate_deal_attractiveness(self, club_profile: dict, all_clubs_data: list) -> dict:
+    def _financial_score(self, club_profile: dict) -> int:
+        """Scores a club's two-year net spend: 80 for a positive spend, 20 for a negative one, else 50."""
+        net_spend = get_net_spend_eur(club_profile.get('poc_metrics', {}).get('financial_analysis', {}))
+        if net_spend is not None and net_spend > 0:
+            return 80 
+        elif net_spend is not None and net_spend < 0:
+            return 20
+        return 50 # Default score
+
+    def _disruption_score(self, club_profile: dict) -> float:
+        """Scales the 0-10 disruption score to 0-100 to match the other scores."""
+        return club_profile.get('poc_metrics', {}).get('squad_disruption_analysis', {}).get('squad_disruption_score', 0.0) * 10
+
+    def build_league_context(self, all_clubs_data: list) -> LeagueContext:
+        """
+        Gathers the league-wide normalization bounds and per-club scores in a single pass over all clubs.
+        """
+        all_depths = [pos['depth'] for club in all_clubs_data for pos in club['poc_metrics']['current_squad_analysis'].values()]
+        all_ages = [pos['avg_age'] for club in all_clubs_data for pos in club['poc_metrics']['current_squad_analysis'].values()]
+        return LeagueContext(
+            min(all_depths), max(all_depths), min(all_ages), max(all_ages),
+            financial_scores={club['club_name']: self._financial_score(club) for club in all_clubs_data},
+            disruption_scores={club['club_name']: self._disruption_score(club) for club in all_clubs_data}
+        )
+
+    def calculate_deal_attractiveness(self, club_profile: dict, all_clubs_data: list | None = None, league_context: LeagueContext | None = None) -> dict:
         """
         Calculates a 'Deal Attractiveness' score for each position at a given club.
+        Pass a prebuilt league_context when scoring several clubs of the same league.
         """
         attractiveness_scores = {}
         squad_analysis = club_profile.get('poc_metrics', {}).get('current_squad_analysis', {})
         
         # --- Create a league-wide context for normalization ---
-        all_depths = [pos['depth'] for club in all_clubs_data for pos in club['poc_metrics']['current_squad_analysis'].values()]
-        all_ages = [pos['avg_age'] for club in all_clubs_data for pos in club['poc_metrics']['current_squad_analysis'].values()]
-        
-        min_depth, max_depth = min(all_depths), max(all_depths)
-        min_age, max_age = min(all_ages), max(all_ages)
+        if league_context is None:
+            league_context = self.build_league_context(all_clubs_data)
         
         # --- Get the financial and disruption scores ---
-        financial_score = 50 # Default score
-        net_spend_str = club_profile.get('poc_metrics', {}).get('financial_analysis', {}).get('two_year_net_spend', '€0.0m')
-        if 'm' in net_spend_str and float(net_spend_str.replace('€','').replace('m','')) > 0:
-            financial_score = 80 
-        elif '-' in net_spend_str:
-            financial_score = 20
-
-        # Scale the 0-10 disruption score to 0-100 to match the other scores
-        disruption_score = club_profile.get('poc_metrics', {}).get('squad_disruption_analysis', {}).get('squad_disruption_score', 0.0) * 10
+        club_name = club_profile.get('club_name')
+        financial_score = league_context.financial_scores.get(club_name)
+        if financial_score is None:
+            financial_score = self._financial_score(club_profile)
+        disruption_score = league_context.disruption_scores.get(club_name)
+        if disruption_score is None:
+            disruption_score = self._disruption_score(club_profile)
 
         for position, data in squad_analysis.items():
             # Invert depth score (lower depth is better)
-            depth_score = 100 - self._normalize_value(data['depth'], min_depth, max_depth)
+            depth_score = 100 - self._normalize_value(data['depth'], league_context.min_depth, league_context.max_depth)
             # Higher age is better
-            age_score = self._normalize_value(data['avg_age'], min_age, max_age)
+            age_score = self._normalize_value(data['avg_age'], league_context.min_age, league_context.max_age)
             
             # --- THE FIX IS HERE: Add the disruption score to the final calculation ---
             final_score = (
@@ -59,4 +94,28 @@ class DealAttractivenessCalculator:
             
             attractiveness_scores[position] = round(final_score, 1)
             
-        return attractiveness_scores
\ No newline at end of file
+        return attractiveness_scores
+
+    def calculate_attractiveness_table(self, all_clubs_data: list) -> pd.DataFrame:
+        """
+        Calculates the attractiveness of every position at every club in one vectorized pass.
+        Returns a club x position DataFrame (NaN where a club has no players in that position).
+        """
+        league_context = self.build_league_context(all_clubs_data)
+        squad_df = pd.DataFrame([
+            {"club_name": club['club_name'], "position": position, "depth": data['depth'], "avg_age": data['avg_age']}
+            for club in all_clubs_data for position, data in club['poc_metrics']['current_squad_analysis'].items()
+        ], columns=['club_name', 'position', 'depth', 'avg_age'])
+
+        depth_scores = 100 - self._normalize_value(squad_df['depth'], league_context.min_depth, league_context.max_depth)
+        age_scores = self._normalize_value(squad_df['avg_age'], league_context.min_age, league_context.max_age)
+        final_scores = (
+            depth_scores * self.weights['squad_depth'] +
+            age_scores * self.weights['incumbent_age'] +
+            squad_df['club_name'].map(league_context.financial_scores) * self.weights['financial_power'] +
+            squad_df['club_name'].map(league_context.disruption_scores) * self.weights['squad_disruption']
+        )
+
+        # Python's round() rather than Series.round(), so scores match calculate_deal_attractiveness exactly
+        squad_df['score'] = [round(score, 1) for score in final_scores]
+        return squad_df.groupby(['club_name', 'position'], sort=False)['score'].first().unstack('position')
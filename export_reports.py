@@ -0,0 +1,149 @@
+# export_reports.py
+
+import argparse
+import io
+import os
+import re
+import time
+import zipfile
+import json
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from asset_cache import inline_asset
+from data_cache import DEFAULT_CACHE_DIR
+from match_finder import MatchFinder
+from player_analyzer import PlayerAnalyzer, PLAYERS_STATS_FILE, PLAYERS_PHYSICAL_FILE, POSITION_KPIS
+from report_renderer import render_document, render_pdf_bytes
+from report_templates import (
+    CLUB_REPORT_CSS, PLAYER_REPORT_CSS, crest_url_for, generate_club_report_html, generate_report_html, top_skills
+)
+
+try:
+    from pypdf import PdfReader, PdfWriter
+except ImportError:  # pypdf is optional: without it a merged PDF is laid out in a single process
+    PdfReader = PdfWriter = None
+
+# --- Configuration ---
+PROFILES_FILE = "./data/processed/club_profiles_final.json"
+CRESTS_FILE = "./data/processed/club_crests.csv"
+OUTPUT_FOLDER = "./reports"
+TOP_MATCHES = 3  # Dossiers per player, as on the Player Analysis page
+
+def slugify(name: str) -> str:
+    return re.sub(r'[^0-9A-Za-z]+', '_', str(name)).strip('_')
+
+def load_crests(crests_path: str) -> dict:
+    if not os.path.exists(crests_path):
+        print(f"[WARN] Crests file not found at {crests_path}; reports will use the placeholder crest.")
+        return {}
+    crests_df = pd.read_csv(crests_path)
+    # Embedded from the local asset store when it has them, so rendering needs no network
+    return {name: inline_asset(url) for name, url in zip(crests_df.club_name_official, crests_df.crest_url)}
+
+def build_club_reports(club_profiles: list, crest_dict: dict) -> list:
+    """One (file name, HTML, CSS) job per club profile."""
+    return [
+        (f"clubs/club_report_{slugify(club['club_name'])}.pdf",
+         generate_club_report_html(club, crest_url_for(club['club_name'], crest_dict), inline_styles=False),
+         CLUB_REPORT_CSS)
+        for club in club_profiles
+    ]
+
+def build_dossiers(finder: MatchFinder, crest_dict: dict, top_matches: int = TOP_MATCHES) -> list:
+    """One (file name, HTML, CSS) job per player and each of their top club matches."""
+    analyzer = finder.player_analyzer
+    jobs = []
+    for row_position in dict.fromkeys(analyzer.name_index.values()):
+        player_row = analyzer.players_df.iloc[row_position]
+        if player_row['position_group'] not in POSITION_KPIS:
+            continue
+        analysis_results = analyzer.get_player_analysis(player_row['firstName'], player_row['lastName'])
+        if not analysis_results:
+            continue
+
+        age = int(player_row['age']) if pd.notna(player_row['age']) else "N/A"
+        player_name = analysis_results['full_name']
+        player_skills = top_skills(analysis_results, n=3)
+
+        for match in finder.find_best_matches(analysis_results)[:top_matches]:
+            report_html = generate_report_html(
+                player_name=player_name,
+                age=age,
+                pos=analysis_results['position_name'],
+                top_skills=player_skills,
+                match_data=match,
+                crest_url=crest_url_for(match['club_name'], crest_dict),
+                inline_styles=False
+            )
+            jobs.append((f"dossiers/{slugify(player_name)}__{slugify(match['club_name'])}.pdf", report_html, PLAYER_REPORT_CSS))
+    return jobs
+
+def _render_job(job: tuple) -> tuple:
+    """Process-pool worker: renders one report, reusing the worker's fonts, stylesheets and images."""
+    file_name, report_html, css = job
+    return file_name, render_pdf_bytes(report_html, css=css)
+
+def render_all(jobs: list, max_workers: int | None = None):
+    """Renders every job across the process pool, yielding (file name, PDF bytes) as they finish."""
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = [pool.submit(_render_job, job) for job in jobs]
+        for future in as_completed(futures):
+            yield future.result()
+
+def write_zip(jobs: list, output_path: str, max_workers: int | None = None):
+    # PDFs are already compressed, so they are stored as they are
+    with zipfile.ZipFile(output_path, 'w', compression=zipfile.ZIP_STORED) as archive:
+        for file_name, pdf_bytes in render_all(jobs, max_workers):
+            archive.writestr(file_name, pdf_bytes)
+
+def write_merged_pdf(jobs: list, output_path: str, max_workers: int | None = None):
+    if PdfWriter is not None:
+        # Render in parallel, then stitch the PDFs together in report order
+        rendered = dict(render_all(jobs, max_workers))
+        writer = PdfWriter()
+        for file_name, _, _ in jobs:
+            writer.append(PdfReader(io.BytesIO(rendered[file_name])))
+        with open(output_path, 'wb') as f:
+            writer.write(f)
+        return
+
+    print("[WARN] pypdf is not installed; laying out the merged PDF in a single process.")
+    documents = [render_document(report_html, css) for _, report_html, css in jobs]
+    all_pages = [page for document in documents for page in document.pages]
+    documents[0].copy(all_pages).write_pdf(output_path)
+
+def main():
+    parser = argparse.ArgumentParser(description="Exports every club profile and top-match dossier as PDFs.")
+    parser.add_argument("--format", choices=["zip", "pdf"], default="zip", help="A zip of PDFs, or one merged PDF.")
+    parser.add_argument("--output", default=None, help="Output file (default: ./reports/league_reports.<format>).")
+    parser.add_argument("--workers", type=int, default=None, help="Render processes (default: one per core).")
+    parser.add_argument("--top-matches", type=int, default=TOP_MATCHES, help="Dossiers per player.")
+    parser.add_argument("--clubs-only", action="store_true", help="Skip the player-club dossiers.")
+    args = parser.parse_args()
+
+    print("\n--- Exporting League Reports ---")
+    with open(PROFILES_FILE, 'r', encoding='utf-8') as f:
+        club_profiles = json.load(f)
+    crest_dict = load_crests(CRESTS_FILE)
+
+    jobs = build_club_reports(club_profiles, crest_dict)
+    if not args.clubs_only:
+        analyzer = PlayerAnalyzer(stats_path=PLAYERS_STATS_FILE, physical_path=PLAYERS_PHYSICAL_FILE, cache_dir=DEFAULT_CACHE_DIR)
+        finder = MatchFinder(club_profiles_path=PROFILES_FILE, player_analyzer=analyzer)
+        jobs += build_dossiers(finder, crest_dict, top_matches=args.top_matches)
+    print(f"[INFO] {len(jobs)} reports to render.")
+
+    output_path = args.output or os.path.join(OUTPUT_FOLDER, f"league_reports.{args.format}")
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+
+    start = time.perf_counter()
+    if args.format == "zip":
+        write_zip(jobs, output_path, args.workers)
+    else:
+        write_merged_pdf(jobs, output_path, args.workers)
+    elapsed = time.perf_counter() - start
+
+    print(f"✅ {len(jobs)} reports written to {output_path} in {elapsed:.1f}s ({len(jobs) / elapsed:.1f} reports/sec).")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+# financials.py
+
+import math
+
+# Transfermarkt amount suffixes and their multipliers
+AMOUNT_SUFFIXES = {'bn': 1_000_000_000, 'm': 1_000_000, 'th.': 1_000, 'k': 1_000}
+
+def parse_eur_amount(amount) -> float | None:
+    """
+    Parses a Transfermarkt-style amount ('€1.23m', '€-500k', '+€1.2bn', '€0') into euros.
+    Numbers are passed through; anything that can't be parsed (including NaN) gives None.
+    """
+    if amount is None:
+        return None
+    if isinstance(amount, (int, float)):
+        return None if math.isnan(amount) else float(amount)
+
+    amount_str = str(amount).strip().lower().replace('€', '').replace(' ', '')
+    multiplier = 1
+    for suffix, suffix_multiplier in AMOUNT_SUFFIXES.items():
+        if amount_str.endswith(suffix):
+            amount_str = amount_str[:-len(suffix)]
+            multiplier = suffix_multiplier
+            break
+    try:
+        return float(amount_str) * multiplier
+    except ValueError:
+        return None
+
+def get_net_spend_eur(financial_analysis: dict) -> float | None:
+    """
+    Reads a profile's two-year net spend in euros. Profiles built before the numeric
+    'net_spend_eur' field existed only carry the formatted 'two_year_net_spend' string.
+    """
+    if 'net_spend_eur' in financial_analysis:
+        return parse_eur_amount(financial_analysis['net_spend_eur'])
+    return parse_eur_amount(financial_analysis.get('two_year_net_spend'))
+
+def format_eur_millions(amount: float | None) -> str:
+    """Formats euros for display, e.g. 1230000 -> '€1.23m'."""
+    if amount is None or (isinstance(amount, float) and math.isnan(amount)):
+        return "Data Not Available"
+    return f"€{amount/1_000_000:.2f}m"
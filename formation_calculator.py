@@ -1,45 +1,206 @@
 # formation_calculator.py
 
 import pandas as pd
+import json
 import os
+import time
 import unicodedata
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from data_cache import DEFAULT_CACHE_DIR, file_fingerprint, temp_path_for, write_json_atomic
+from club_registry import CLUB_REGISTRY
+from wyscout_loader import DATASET_MANIFEST
+
+# Event files are read in chunks of this many rows, so memory stays flat however long the season is
+EVENT_CHUNK_SIZE = 100_000
+# The only event columns formations need ('matchId' is optional and enables per-match counts)
+FORMATION_COLUMNS = ['team.id', 'team.formation', 'matchId']
+# Columns of the formations table ClubProfileBuilder reads
+FORMATION_TABLE_COLUMNS = ['team.name', 'formation.primary', 'formation.secondary', 'status']
+FORMATION_CACHE_FILE = "formations.json"
 
 # We need our normalization function here as well
 def normalize_text(text: str) -> str:
     if not isinstance(text, str): return text
     return "".join(c for c in unicodedata.normalize('NFD', text) if unicodedata.category(c) != 'Mn')
 
+def _ranked(counts: Counter) -> list:
+    """Formations from most to least used; ties go to the alphabetically first one, like Series.mode()."""
+    return sorted(counts, key=lambda formation: (-counts[formation], formation))
+
+def _count_team_formations(base_path: str, chunk_size: int, file_path: str, team_id: int) -> dict | None:
+    """Process-pool worker: counts one team's formations."""
+    return FormationCalculator(base_path, chunk_size=chunk_size).count_formations(file_path, team_id)
+
 class FormationCalculator:
-    def __init__(self, data_folder_path: str):
+    def __init__(self, data_folder_path: str, chunk_size: int = EVENT_CHUNK_SIZE):
         self.base_path = data_folder_path
+        self.chunk_size = chunk_size
 
-    def get_primary_formation(self, team_name: str, team_id: int) -> str | None:
-        """
-        Calculates the most frequent formation for a team from their event file.
-        """
+    def get_event_file_path(self, team_name: str, season: str = "2024-2025") -> str:
+        """Path of a team's event file, e.g. data/raw/Otelul_2024_2025_events.csv."""
         # --- THE FIX IS HERE ---
         # We now use our robust normalize_text function
         team_name_normalized = normalize_text(team_name)
         team_name_slug = team_name_normalized.replace(" ", "_")
-        event_file = f"{team_name_slug}_2024_2025_events.csv"
-        file_path = os.path.join(self.base_path, 'raw', event_file)
+        event_file = f"{team_name_slug}_{season.replace('-', '_')}_events.csv"
+        return os.path.join(self.base_path, 'raw', event_file)
+
+    def count_formations(self, file_path: str, team_id: int) -> dict | None:
+        """
+        Streams an event file in chunks, reading only the formation columns, and keeps running counts.
+        Returns the primary and secondary formations, event counts per formation and, when the file
+        has a matchId column, the formation each match was mostly played in.
+        """
+        header = pd.read_csv(file_path, nrows=0).columns
+        if 'team.id' not in header or 'team.formation' not in header:
+            return None
+        usecols = [column for column in FORMATION_COLUMNS if column in header]
+        has_matches = 'matchId' in usecols
+
+        event_counts = Counter()
+        match_counts = Counter()  # (matchId, formation) -> events; bounded by matches x formations
+        reader = pd.read_csv(file_path, usecols=usecols, chunksize=self.chunk_size, dtype={'team.formation': 'category'})
+        for chunk in reader:
+            team_events = chunk[chunk['team.id'] == team_id].dropna(subset=['team.formation'])
+            if team_events.empty:
+                continue
+            event_counts.update(team_events['team.formation'].value_counts(sort=False).loc[lambda counts: counts > 0].to_dict())
+            if has_matches:
+                per_match = team_events.groupby(['matchId', 'team.formation'], observed=True).size()
+                match_counts.update(per_match.to_dict())
+
+        if not event_counts:
+            return None
+
+        ranked = _ranked(event_counts)
+
+        # --- Per-match view: the formation each match was mostly played in ---
+        formations_by_match = {}
+        for (match_id, formation), count in match_counts.items():
+            formations_by_match.setdefault(match_id, Counter())[formation] = count
+        match_formations = {int(match_id): _ranked(counts)[0] for match_id, counts in sorted(formations_by_match.items())}
+
+        return {
+            "primary": ranked[0],
+            "secondary": ranked[1] if len(ranked) > 1 else None,
+            "event_frequencies": {formation: int(event_counts[formation]) for formation in ranked},
+            "match_frequencies": {formation: count for formation, count in Counter(match_formations.values()).most_common()},
+            "match_formations": match_formations,
+        }
+
+    def get_formation_profile(self, team_name: str, team_id: int) -> dict | None:
+        """
+        Primary, secondary and per-match formation frequencies for a team, from their event file.
+        """
+        file_path = self.get_event_file_path(team_name)
 
         print(f"[LOG] Searching for event file: {file_path}")
         if not os.path.exists(file_path):
             print(f"[LOG] Event file not found for {team_name}. Cannot calculate formation.")
             return None
-        
-        try:
-            events_df = pd.read_csv(file_path)
-            team_events_df = events_df[events_df['team.id'] == team_id]
-            
-            if team_events_df.empty or 'team.formation' not in team_events_df.columns:
-                return None
-
-            primary_formation = team_events_df['team.formation'].mode()[0]
-            print(f"[LOG] Calculated primary formation for {team_name}: {primary_formation}")
-            return primary_formation
 
+        try:
+            return self.count_formations(file_path, team_id)
         except Exception as e:
             print(f"❌ Error processing event file for {team_name}: {e}")
-            return None
\ No newline at end of file
+            return None
+
+    def get_primary_formation(self, team_name: str, team_id: int) -> str | None:
+        """
+        Calculates the most frequent formation for a team from their event file.
+        """
+        formation_profile = self.get_formation_profile(team_name, team_id)
+        if formation_profile is None:
+            return None
+
+        primary_formation = formation_profile["primary"]
+        print(f"[LOG] Calculated primary formation for {team_name}: {primary_formation}")
+        return primary_formation
+
+    def all_formations(self, league: str = "Romanian Superliga", season: str = "2024-2025",
+                       max_workers: int | None = None, cache_dir: str = DEFAULT_CACHE_DIR, write: bool = True) -> pd.DataFrame:
+        """
+        Computes every team's formations from their event files in a process pool and writes the
+        formations table ClubProfileBuilder reads. Results are cached by event-file fingerprint, so
+        only files that changed since the last run are processed again. Teams without an event file
+        (e.g. promoted clubs) keep their existing rows.
+        """
+        start = time.perf_counter()
+        manifest = DATASET_MANIFEST[(league, season)]
+        teams_df = pd.read_csv(os.path.join(self.base_path, manifest["teams"]), usecols=['team.id', 'team.name'])
+        formations_path = os.path.join(self.base_path, manifest["formations"])
+        if os.path.exists(formations_path):
+            formations_df = pd.read_csv(formations_path).reindex(columns=FORMATION_TABLE_COLUMNS)
+        else:
+            formations_df = pd.DataFrame(columns=FORMATION_TABLE_COLUMNS)
+
+        cache_path = os.path.join(cache_dir, FORMATION_CACHE_FILE)
+        cache = {}
+        if os.path.exists(cache_path):
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                cache = json.load(f)
+
+        # --- Work out which event files changed since the cached run ---
+        results, pending = {}, {}
+        teams_df = teams_df.drop_duplicates(subset='team.name')
+        missing = teams_df['team.name'].isna() | teams_df['team.id'].isna()
+        if missing.any():
+            print(f"[WARN] Skipping {int(missing.sum())} team row(s) without a team name or id.")
+            teams_df = teams_df[~missing]
+        for team_name, team_id in zip(teams_df['team.name'], teams_df['team.id'].astype(int)):
+            # Clubs the registry does not know keep their own name, as in the event file names
+            event_name = CLUB_REGISTRY.canonical_name(team_name) or team_name
+            file_path = self.get_event_file_path(event_name, season)
+            if not os.path.exists(file_path):
+                continue
+            cache_key = os.path.abspath(file_path)
+            cached = cache.get(cache_key)
+            fingerprint = file_fingerprint(file_path, known=cached['fingerprint'] if cached else None)
+            if cached and cached['team_id'] == int(team_id) and cached['fingerprint']['sha1'] == fingerprint['sha1']:
+                cache[cache_key]['fingerprint'] = fingerprint
+                results[team_name] = cached['formations']
+            else:
+                pending[team_name] = (cache_key, fingerprint, file_path, team_id)
+
+        print(f"[LOG] Formations: {len(results)} team(s) unchanged, {len(pending)} to compute.")
+        if pending:
+            with ProcessPoolExecutor(max_workers=max_workers) as pool:
+                futures = {
+                    team_name: pool.submit(_count_team_formations, self.base_path, self.chunk_size, file_path, int(team_id))
+                    for team_name, (_, _, file_path, team_id) in pending.items()
+                }
+                for team_name, future in futures.items():
+                    cache_key, fingerprint, _, team_id = pending[team_name]
+                    try:
+                        results[team_name] = future.result()
+                    except Exception as e:
+                        print(f"❌ Error processing event file for {team_name}: {e}")
+                        continue
+                    cache[cache_key] = {"fingerprint": fingerprint, "team_id": int(team_id), "formations": results[team_name]}
+            os.makedirs(cache_dir, exist_ok=True)
+            write_json_atomic(cache_path, cache)
+
+        # --- Merge into the existing table: computed teams are updated, the rest are kept ---
+        table = formations_df.set_index('team.name', drop=False)
+        for team_name, formation_profile in results.items():
+            if formation_profile is None:
+                continue
+            status = table.at[team_name, 'status'] if team_name in table.index else "Established"
+            table.loc[team_name, FORMATION_TABLE_COLUMNS] = [team_name, formation_profile["primary"], formation_profile["secondary"], status]
+        table = table.reset_index(drop=True)[FORMATION_TABLE_COLUMNS]
+
+        if write:
+            temp_path = temp_path_for(formations_path)
+            try:
+                table.to_csv(temp_path, index=False, encoding='utf-8')
+                os.replace(temp_path, formations_path)
+            finally:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+            print(f"✅ Formations for {len(table)} teams saved to {formations_path} in {time.perf_counter() - start:.2f}s.")
+        return table
+
+if __name__ == "__main__":
+    calculator = FormationCalculator("./data")
+    print(calculator.all_formations().to_string(index=False))
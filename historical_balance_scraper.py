@@ -5,6 +5,7 @@ from bs4 import BeautifulSoup
 import pandas as pd
 from collections import defaultdict
 import os
+from financials import parse_eur_amount
 
 # Define the output path
 OUTPUT_FILE = './data/processed/superliga_transfer_balances.csv'
@@ -30,25 +31,16 @@ def scrape_historical_balance(seasons: list):
                 balance_tag = row.select_one('td.rechts.hauptlink span')
                 if club_name_tag and balance_tag:
                     club_name = club_name_tag.get('title').strip()
-                    balance_str = balance_tag.text.strip().replace('€', '')
-                    value = 0.0
-                    multiplier = 1
-                    if 'm' in balance_str:
-                        multiplier = 1_000_000
-                        balance_str = balance_str.replace('m', '')
-                    elif 'k' in balance_str:
-                        multiplier = 1_000
-                        balance_str = balance_str.replace('k', '')
-                    try:
-                        value = float(balance_str) * multiplier
-                    except ValueError:
+                    value = parse_eur_amount(balance_tag.text.strip())
+                    if value is None:
                         value = 0.0
                     club_balances[club_name] += value
         except requests.exceptions.RequestException as e:
             print(f"❌ Error scraping season {season}: {e}")
             continue
     
-    summary_data = [{"club_name_transfermarkt": name, "two_year_net_spend": f"€{balance/1_000_000:.2f}m"} for name, balance in club_balances.items()]
+    # Keep the balance numeric; it is only formatted for display
+    summary_data = [{"club_name_transfermarkt": name, "net_spend_eur": balance} for name, balance in club_balances.items()]
     df = pd.DataFrame(summary_data)
     
     # --- NEW: Save the output to a CSV file ---
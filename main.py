@@ -2,7 +2,12 @@
 
 import json
 from wyscout_loader import WyscoutDataLoader
-from profile_builder import ClubProfileBuilder
+from profile_builder import ClubProfileBuilder, REQUIRED_COLUMNS
+from player_analyzer import PlayerAnalyzer, PLAYERS_STATS_FILE, PLAYERS_PHYSICAL_FILE
+from match_finder import MatchFinder
+from talent_index import TalentIndex, TALENT_INDEX_FILE
+from schema import reference_date
+from data_cache import DEFAULT_CACHE_DIR
 
 # --- Configuration ---
 DATA_FOLDER = "./data"
@@ -14,12 +19,14 @@ if __name__ == "__main__":
     print("\n--- Running Main Data Pipeline ---")
     
     # Step 1: Load the data from the correct subfolders
-    loader = WyscoutDataLoader(data_folder_path=DATA_FOLDER)
+    loader = WyscoutDataLoader(data_folder_path=DATA_FOLDER, use_cache=True, columns=REQUIRED_COLUMNS)
     load_success = loader.load_romanian_superliga_data()
+    # One age reference date for the whole run (squad ages in the profiles, ages in the talent finder)
+    as_of = reference_date()
 
     if load_success:
         # Step 2: Build the profiles if data loaded successfully
-        builder = ClubProfileBuilder(loader=loader)
+        builder = ClubProfileBuilder(loader=loader, as_of=as_of)
         profiles = builder.build_all_profiles()
 
         # Step 3: Save the complete output to a file
@@ -32,6 +39,11 @@ if __name__ == "__main__":
                 json.dump(profiles, f, indent=2, ensure_ascii=False)
                 
             print(f"Final JSON output saved to: {OUTPUT_FILE}")
+
+            # Step 4: Precompute every club/position talent-finder ranking from the new profiles
+            analyzer = PlayerAnalyzer(stats_path=PLAYERS_STATS_FILE, physical_path=PLAYERS_PHYSICAL_FILE, cache_dir=DEFAULT_CACHE_DIR, as_of=as_of)
+            finder = MatchFinder(club_profiles_path=OUTPUT_FILE, player_analyzer=analyzer)
+            TalentIndex.build(finder).save(TALENT_INDEX_FILE)
             
             # We can still print a sample if we want
             print("\n--- Sample of first club profile ---")
@@ -1,8 +1,13 @@
 # match_finder.py (Final Corrected Version)
 import json
+import hashlib
+import threading
+import numpy as np
 import pandas as pd
-from collections import defaultdict
-from player_analyzer import PlayerAnalyzer, KPI_FORMATED_NAMES, PLAYERS_STATS_FILE, PLAYERS_PHYSICAL_FILE
+from collections import defaultdict, OrderedDict
+from data_cache import file_fingerprint
+from financials import get_net_spend_eur
+from player_analyzer import PlayerAnalyzer, KPI_FORMATED_NAMES, POSITION_KPIS, PLAYERS_STATS_FILE, PLAYERS_PHYSICAL_FILE, name_key
 
 # --- FINAL, INTELLIGENT FORMATION FIT MATRIX ---
 FORMATION_FIT_MATRIX = {
@@ -17,18 +22,196 @@ FORMATION_FIT_MATRIX = {
     "Wing-Back":              {"3-5-2": 100, "3-4-3": 100, "5-3-2": 100, "4-4-2": 30, "4-3-3": 20}
 }
 
+# --- Compiled fit table: FORMATION_FIT_MATRIX as a dense (role, formation) array ---
+FIT_ROLES = list(FORMATION_FIT_MATRIX)
+FIT_FORMATIONS = list(dict.fromkeys(formation for fits in FORMATION_FIT_MATRIX.values() for formation in fits))
+UNKNOWN_ROLE_ROW = len(FIT_ROLES)                 # positions no matrix role matches
+UNKNOWN_FORMATION_COLUMN = len(FIT_FORMATIONS)    # formations the matrix doesn't list
+NO_FORMATION_COLUMN = len(FIT_FORMATIONS) + 1     # clubs without a primary formation
+
+def _compile_fit_table() -> np.ndarray:
+    table = np.full((len(FIT_ROLES) + 1, len(FIT_FORMATIONS) + 2), 70.0)
+    for row, fits in enumerate(FORMATION_FIT_MATRIX.values()):
+        for formation, score in fits.items():
+            table[row, FIT_FORMATIONS.index(formation)] = score
+    table[:, NO_FORMATION_COLUMN] = 50
+    return table
+
+FORMATION_FIT_TABLE = _compile_fit_table()
+FORMATION_FIT_COLUMNS = {formation: column for column, formation in enumerate(FIT_FORMATIONS)}
+
+# Wyscout position name -> FORMATION_FIT_TABLE row, resolved once per name
+_fit_rows = {}
+
+def fit_row(position_name: str) -> int:
+    """
+    The fit-table row of a Wyscout position name: the first matrix role contained in it
+    (e.g. 'Right Winger' -> 'Winger'). Names no role matches are logged once.
+    """
+    row = _fit_rows.get(position_name)
+    if row is None:
+        role = next((key for key in FIT_ROLES if key in position_name), None)
+        if role is None:
+            print(f"[WARN] No formation fit for position '{position_name}'; using the neutral score.")
+        row = _fit_rows[position_name] = UNKNOWN_ROLE_ROW if role is None else FIT_ROLES.index(role)
+    return row
+
+def fit_column(club_formation) -> int:
+    """The fit-table column of a club's primary formation."""
+    if not club_formation or not isinstance(club_formation, str):
+        return NO_FORMATION_COLUMN
+    return FORMATION_FIT_COLUMNS.get(club_formation, UNKNOWN_FORMATION_COLUMN)
+
+def tactical_fit_scores(position_names, club_formations) -> np.ndarray:
+    """Tactical fit of every (position, formation) pair, shape (positions, formations), in one lookup."""
+    rows = np.array([fit_row(pos) for pos in position_names], dtype=np.intp)
+    columns = np.array([fit_column(formation) for formation in club_formations], dtype=np.intp)
+    return FORMATION_FIT_TABLE[rows[:, None], columns[None, :]]
+
+# Weights of the two components of the final match score
+DEAL_WEIGHT = 0.70
+TACTICAL_WEIGHT = 0.30
+
+# Players whose club matches are kept in memory (least recently used are dropped first)
+MATCH_MEMO_SIZE = 256
+
+def round_scores(scores: np.ndarray) -> np.ndarray:
+    """
+    Vectorized equivalent of Python's round(score, 1). np.round scales by 10 first, which can
+    tip values sitting next to a .x5 boundary the other way, so those few are rounded in Python.
+    """
+    rounded = np.round(scores, 1)
+    near_tie = np.abs(np.abs(scores * 10 % 1) - 0.5) < 1e-6
+    for index in zip(*np.nonzero(near_tie)):
+        rounded[index] = round(float(scores[index]), 1)
+    return rounded
+
+def top_k_order(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    Indices of the k highest scores, in the order a stable descending sort would give them,
+    found with a partial sort (np.partition) instead of sorting every score.
+    """
+    if k >= len(scores):
+        return np.argsort(-scores, kind='stable')
+    if k <= 0:
+        return np.array([], dtype=np.intp)
+    kth_highest = -np.partition(-scores, k - 1)[k - 1]
+    candidates = np.flatnonzero(scores >= kth_highest)
+    return candidates[np.argsort(-scores[candidates], kind='stable')][:k]
+
+class MatchScoringEngine:
+    """
+    Holds every per-(position, club) input of the match score as NumPy arrays, so a whole
+    player x club matrix can be scored with one broadcast instead of one dict walk per pair.
+    Rows are indexed by position (see position_rows), columns by club (see club_names).
+    The last row is an all-NaN sentinel used for positions no club has data for.
+    """
+    def __init__(self, club_profiles: dict, league_averages: dict):
+        self.club_names = list(club_profiles.keys())
+        self.club_index = {name: col for col, name in enumerate(self.club_names)}
+
+        positions = dict.fromkeys(
+            pos for club in club_profiles.values()
+            for pos in club.get('poc_metrics', {}).get('deal_attractiveness_index', {})
+        )
+        self.position_names = list(positions)
+        self.position_index = {pos: row for row, pos in enumerate(self.position_names)}
+
+        shape = (len(self.position_names) + 1, len(self.club_names))
+        self.deal_scores = np.full(shape, np.nan)
+        self.squad_depths = np.full(shape, np.nan)
+        self.squad_ages = np.full(shape, np.nan)
+        self.net_spends = np.full(len(self.club_names), np.nan)
+        has_position = np.zeros(shape, dtype=bool)
+        club_formations = [None] * len(self.club_names)
+
+        for col, club in enumerate(club_profiles.values()):
+            poc_metrics = club.get('poc_metrics', {})
+            # Fail-safe for promoted teams with no data: their column stays NaN
+            if not poc_metrics: continue
+
+            club_formations[col] = poc_metrics.get('tactical_analysis', {}).get('primary_formation')
+            squad_analysis = poc_metrics.get('current_squad_analysis', {})
+            for pos, deal_score in poc_metrics.get('deal_attractiveness_index', {}).items():
+                row = self.position_index[pos]
+                self.deal_scores[row, col] = deal_score
+                has_position[row, col] = True
+                self.squad_depths[row, col] = squad_analysis.get(pos, {}).get('depth', 5)
+                self.squad_ages[row, col] = squad_analysis.get(pos, {}).get('avg_age', 25)
+            net_spend = get_net_spend_eur(poc_metrics.get('financial_analysis', {}))
+            self.net_spends[col] = np.nan if net_spend is None else net_spend
+
+        # Fit of every position in every club's formation, kept where the club has that position
+        tactical_fit = np.vstack([
+            tactical_fit_scores(self.position_names, club_formations),
+            np.full((1, len(self.club_names)), np.nan)
+        ])
+        self.tactical_scores = np.where(has_position, tactical_fit, np.nan)
+
+        self.avg_depths = np.array([league_averages['depth'].get(pos, 5) for pos in self.position_names] + [np.nan])
+        self.avg_ages = np.array([league_averages['age'].get(pos, 26) for pos in self.position_names] + [np.nan])
+        self.avg_net_spend = league_averages['net_spend']
+
+    def position_rows(self, position_names) -> np.ndarray:
+        """Maps position names to matrix rows (-1, the NaN sentinel row, for unknown positions)."""
+        return np.array([self.position_index.get(pos, -1) for pos in position_names], dtype=np.intp)
+
+    def score(self, position_rows: np.ndarray, club_columns=slice(None)) -> tuple:
+        """
+        Scores every (position row, club column) pair at once.
+        Returns (final, deal, tactical) arrays of shape (rows, clubs); unscorable pairs are NaN.
+        """
+        deal = self.deal_scores[position_rows][:, club_columns]
+        tactical = self.tactical_scores[position_rows][:, club_columns]
+        final = round_scores(deal * DEAL_WEIGHT + tactical * TACTICAL_WEIGHT)
+        return final, deal, tactical
+
+    def build_reason(self, position_row: int, club_column: int) -> str:
+        """Generates the key-driver text for one pair; only called for rows that are displayed."""
+        reasons = []
+        if self.squad_depths[position_row, club_column] <= self.avg_depths[position_row] * 0.75:
+            reasons.append("Low Depth")
+        if self.squad_ages[position_row, club_column] >= self.avg_ages[position_row] * 1.1:
+            reasons.append("Aging Squad")
+
+        net_spend = self.net_spends[club_column]
+        if net_spend > 0 and net_spend >= self.avg_net_spend:
+            reasons.append("Has Funds")
+
+        tactical_score = self.tactical_scores[position_row, club_column]
+        if tactical_score >= 80:
+            reasons.append("Ideal Formation")
+        elif tactical_score >= 60:
+            reasons.append("Good Formation")
+
+        return " | ".join(reasons) if reasons else "Balanced Need"
+
 class MatchFinder:
     def __init__(self, club_profiles_path: str,player_analyzer: PlayerAnalyzer):
         """
         Initializes the MatchFinder with a path to club profiles and a PlayerAnalyzer instance.
         """
         self.player_analyzer = player_analyzer
+        self.data_version = None
+
+        # Bounded LRU memo of find_best_matches, shared by every session using this finder
+        self._match_memo = OrderedDict()
+        self._match_memo_lock = threading.Lock()
+        self.memo_hits = 0
+        self.memo_misses = 0
         try:
             with open(club_profiles_path, 'r', encoding='utf-8') as f:
                 profiles_data = json.load(f)
                 self.club_profiles = {club['club_name']: club for club in profiles_data}
                 print(f"[INFO] Successfully loaded {len(self.club_profiles)} club profiles.")
+            # Identifies the profiles + player data the scores come from
+            self.data_version = hashlib.sha1(
+                (file_fingerprint(club_profiles_path)['sha1'] + getattr(player_analyzer, 'data_version', '')).encode('utf-8')
+            ).hexdigest()
             self._calculate_league_averages()
+            self.scoring_engine = MatchScoringEngine(self.club_profiles, self.league_averages)
+            # (club, position group) -> (players_df rows, match scores), so paging doesn't re-score
+            self._club_player_scores = {}
         except FileNotFoundError:
             self.club_profiles = []
             print(f"❌ ERROR: Club profiles file not found at {club_profiles_path}")
@@ -42,11 +225,10 @@ class MatchFinder:
             poc_metrics = club.get('poc_metrics', {})
             if not poc_metrics: continue
 
-            net_spend_str = club['poc_metrics']['financial_analysis']['two_year_net_spend'].replace('€', '').replace('m', '')
-            try:
-                all_spends.append(float(net_spend_str) * 1_000_000)
-            except (ValueError, TypeError):
+            net_spend = get_net_spend_eur(club['poc_metrics']['financial_analysis'])
+            if net_spend is None:
                 continue
+            all_spends.append(net_spend)
             for pos, data in club['poc_metrics']['current_squad_analysis'].items():
                 all_positions[pos]['depths'].append(data['depth'])
                 all_positions[pos]['ages'].append(data['avg_age'])
@@ -56,87 +238,82 @@ class MatchFinder:
             self.league_averages['age'][pos] = sum(data['ages']) / len(data['ages'])
 
     def _get_tactical_fit_score(self, player_position: str, club_formation: str) -> int:
-        # This function is now rewritten to correctly use the new matrix.
-        if not club_formation or not isinstance(club_formation, str):
-            return 50
+        # Single-pair lookup into the compiled fit table (see tactical_fit_scores for batches)
+        return int(FORMATION_FIT_TABLE[fit_row(player_position), fit_column(club_formation)])
 
-        best_match_key = next((key for key in FORMATION_FIT_MATRIX if key in player_position), None)
-        return FORMATION_FIT_MATRIX[best_match_key].get(club_formation, 70) if best_match_key else 70
+    def _match_result(self, position_row: int, club_column: int, final: float, deal: float, tactical: float) -> dict:
+        """Builds the presentation dict (including the reason text) for one scored pair."""
+        return {
+            "club_name": self.scoring_engine.club_names[club_column],
+            "match_score": float(final),
+            "reason": self.scoring_engine.build_reason(position_row, club_column),
+            "deal_score": float(deal),
+            "tactical_score": int(tactical)
+        }
 
     def _calculate_match_score(self, player_profile: dict, club_profile: dict) -> dict:
         """
         Calculates the final match score and generates the reasons for a single player-club pair.
         """
-        player_pos = player_profile['position_name']
-        poc_metrics = club_profile.get('poc_metrics', {})
-        
-        # Fail-safe for promoted teams with no data
-        if not poc_metrics:
+        engine = self.scoring_engine
+        position_row = engine.position_rows([player_profile['position_name']])
+        club_column = engine.club_index.get(club_profile['club_name'])
+        if club_column is None:
             return None
 
-        attractiveness_index = poc_metrics.get('deal_attractiveness_index', {})
-        if player_pos not in attractiveness_index:
+        final, deal, tactical = engine.score(position_row, [club_column])
+        if np.isnan(final[0, 0]):
             return None
-
-        deal_score = attractiveness_index[player_pos]
-        club_formation = poc_metrics.get('tactical_analysis', {}).get('primary_formation')
-        tactical_score = self._get_tactical_fit_score(player_pos, club_formation)
-        final_score = (deal_score * 0.70) + (tactical_score * 0.30)
-        
-        # Generate dynamic reasons
-        reasons = []
-        squad_pos_data = poc_metrics.get('current_squad_analysis', {}).get(player_pos, {})
-        financial_data = poc_metrics.get('financial_analysis', {})
-
-        avg_depth = self.league_averages['depth'].get(player_pos, 5)
-        avg_age = self.league_averages['age'].get(player_pos, 26)
-        
-        if squad_pos_data.get('depth', 5) <= avg_depth * 0.75:
-            reasons.append("Low Depth")
-        if squad_pos_data.get('avg_age', 25) >= avg_age * 1.1:
-            reasons.append("Aging Squad")
-
-        net_spend_str = financial_data.get('two_year_net_spend', '€0m').replace('€', '').replace('m', '')
-        try:
-            net_spend = float(net_spend_str) * 1_000_000
-            if net_spend > 0 and net_spend >= self.league_averages['net_spend']:
-                reasons.append("Has Funds")
-        except (ValueError, TypeError):
-            pass
-
-        if tactical_score >= 80:
-            reasons.append("Ideal Formation")
-        elif tactical_score >= 60:
-            reasons.append("Good Formation")
-
-        reason_str = " | ".join(reasons) if reasons else "Balanced Need"
-        
-        return {
-            "club_name": club_profile['club_name'],
-            "match_score": round(final_score, 1),
-            "reason": reason_str,
-            "deal_score": deal_score,
-            "tactical_score": tactical_score
-        }
+        return self._match_result(position_row[0], club_column, final[0, 0], deal[0, 0], tactical[0, 0])
 
     def find_best_matches(self, player_profile: dict) -> list:
         """
         Analyzes all clubs to find the best matches for a given player profile,
         including a key differentiator for the top recommendation.
+        Results are memoized per player and data version (see MATCH_MEMO_SIZE).
         """
         if not player_profile or 'position_name' not in player_profile:
             print("❌ ERROR: Invalid player profile provided.")
             return []
 
-        # Loop through all clubs and call the central scoring function
-        all_matches = []
-        for club_profile in self.club_profiles.values():
-            match_scores = self._calculate_match_score(player_profile, club_profile)
-            if match_scores:
-                all_matches.append(match_scores)
-        
-        # Sort all matches first
-        sorted_matches = sorted(all_matches, key=lambda x: x['match_score'], reverse=True)
+        memo_key = (name_key(player_profile.get('full_name')), player_profile['position_name'], self.data_version)
+        with self._match_memo_lock:
+            cached_matches = self._match_memo.get(memo_key)
+            if cached_matches is not None:
+                self.memo_hits += 1
+                self._match_memo.move_to_end(memo_key)
+            else:
+                self.memo_misses += 1
+        if cached_matches is None:
+            cached_matches = self._rank_clubs(player_profile)
+            with self._match_memo_lock:
+                self._match_memo[memo_key] = cached_matches
+                self._match_memo.move_to_end(memo_key)
+                while len(self._match_memo) > MATCH_MEMO_SIZE:
+                    self._match_memo.popitem(last=False)
+
+        # Callers get their own copies, so the memoized results can't be changed through them
+        return [dict(match) for match in cached_matches]
+
+    def clear_match_memo(self):
+        with self._match_memo_lock:
+            self._match_memo.clear()
+
+    def _rank_clubs(self, player_profile: dict) -> list:
+        """Scores the player against every club and ranks them (the uncached part of find_best_matches)."""
+        # Score the player against every club in one vectorized pass
+        engine = self.scoring_engine
+        position_row = engine.position_rows([player_profile['position_name']])
+        final, deal, tactical = engine.score(position_row)
+        final, deal, tactical = final[0], deal[0], tactical[0]
+
+        # Sort the scorable clubs (stable, so ties keep the club order) and build reasons only for them
+        scorable_columns = np.flatnonzero(~np.isnan(final))
+        ranked_columns = scorable_columns[np.argsort(-final[scorable_columns], kind='stable')]
+        sorted_matches = [
+            self._match_result(position_row[0], col, final[col], deal[col], tactical[col])
+            for col in ranked_columns
+        ]
         
         # --- Your existing differentiator logic is preserved here ---
         if len(sorted_matches) > 1:
@@ -167,58 +344,76 @@ class MatchFinder:
 
         return sorted_matches
 
-    def find_best_players_for_club(self, target_club_name: str, target_position_group: str) -> list:
+    def _score_players_for_club(self, target_club_name: str, target_position_group: str) -> tuple:
+        """
+        Scores every player of a position group against one club, once per (club, group).
+        Returns (players_df row positions, match scores) for the scorable players.
+        """
+        cache_key = (target_club_name, target_position_group)
+        if cache_key not in self._club_player_scores:
+            # PlayerAnalyzer already keeps one row per player (their most-played role),
+            # so the position group filter is all that's needed here.
+            all_players = self.player_analyzer.players_df
+            relevant_rows = np.flatnonzero((all_players['position_group'] == target_position_group).to_numpy())
+
+            engine = self.scoring_engine
+            position_rows = engine.position_rows(all_players['positions.position.name'].iloc[relevant_rows])
+            match_scores = engine.score(position_rows, [engine.club_index[target_club_name]])[0][:, 0]
+            scorable = ~np.isnan(match_scores)
+            self._club_player_scores[cache_key] = (relevant_rows[scorable], match_scores[scorable])
+        return self._club_player_scores[cache_key]
+
+    def find_best_players_for_club(self, target_club_name: str, target_position_group: str, top_k: int | None = None, offset: int = 0, birth_dates: bool = False) -> list:
         """
         Finds the best-fitting players for a specific club and position, ensuring each player is analyzed only once.
+        Returns the players ranked offset .. offset + top_k (all remaining players if top_k is None);
+        scores are cached per club and position group, so paging through results doesn't re-score.
+        With birth_dates, rows carry each player's "Birth Date" (ISO, or None) instead of their age,
+        for rankings that are stored and served on later days (see TalentIndex).
         """        
         target_club_profile = self.club_profiles.get(target_club_name)
         if not target_club_profile:
             print(f"  [ERROR] Could not find profile for club: {target_club_name}")
             return []
 
-        all_players = self.player_analyzer.players_df
+        if target_position_group not in POSITION_KPIS:
+            return []
 
-        # --- De-duplicate the player list ---
-        # 1. Sort players by minutes played to ensure their primary position/entry is first.
-        sorted_players_by_minutes = all_players.sort_values(by='total.minutesOnField', ascending=False)
-        
-        # 2. Drop duplicates based on the player's full name, keeping only their most-played role.
-        unique_players_df = sorted_players_by_minutes.drop_duplicates(subset='full_name', keep='first')
+        player_rows, match_scores = self._score_players_for_club(target_club_name, target_position_group)
+
+        # Select the requested page on the numeric scores alone
+        page_end = len(match_scores) if top_k is None else offset + top_k
+        page_order = top_k_order(match_scores, page_end)[offset:]
+        page_rows, page_scores = player_rows[page_order], match_scores[page_order]
+        if len(page_rows) == 0:
+            return []
+
+        # Build the presentation fields only for the selected page
+        page_players = self.player_analyzer.players_df.iloc[page_rows]
+        player_analyses = self.player_analyzer.get_player_analyses(player_rows=page_rows)
+        top_skills = player_analyses.sort_values(by='percentile', ascending=False, kind='stable').groupby('player_idx').head(3)
         
-        # 3. Filter these unique players by the desired position group.
-        relevant_players = unique_players_df[unique_players_df['position_group'] == target_position_group]
+        # Format the strengths to include the percentile, joined with a unique separator for easy splitting in the UI
+        top_skills = top_skills.assign(strength=[
+            f"{KPI_FORMATED_NAMES.get(skill, skill)} (Top {100-percentile:.0f}%)"
+            for skill, percentile in zip(top_skills['kpi'], top_skills['percentile'])
+        ])
+        key_strengths = top_skills.groupby('player_idx', sort=False)['strength'].agg(" | ".join)
 
-        all_player_matches = []
-        for _, player_row in relevant_players.iterrows():
-            player_profile = self.player_analyzer.get_player_analysis(player_row['firstName'], player_row['lastName'])
-            
-            if player_profile:
-                # This print statement will now only appear once per unique player
-                match_scores = self._calculate_match_score(player_profile, target_club_profile)
-                
-                if match_scores:
-                    # 1. Get the player's top 3 skills with their percentile data
-                    top_skills_data = sorted(player_profile['analysis'].items(), key=lambda item: item[1]['percentile'], reverse=True)[:3]
-                    
-                    # 2. Format the strengths to include the percentile, separated by a special character
-                    strengths_with_scores = []
-                    for skill, data in top_skills_data:
-                        pretty_name = KPI_FORMATED_NAMES.get(skill, skill)
-                        percentile = data['percentile']
-                        strength_str = f"{pretty_name} (Top {100-percentile:.0f}%)"
-                        strengths_with_scores.append(strength_str)
-                    
-                    all_player_matches.append({
-                        "Player Name": player_row['full_name'],
-                        "Age": int((pd.to_datetime('today') - pd.to_datetime(player_row['birthDate'])).days / 365.25),
-                        "Current Club": player_row['teams.name'],
-                        "Match Score": match_scores['match_score'],
-                        # 3. Join with a unique separator for easy splitting in the UI
-                        "Key Strengths": " | ".join(strengths_with_scores) 
-                    })
-
-        sorted_players = sorted(all_player_matches, key=lambda x: x['Match Score'], reverse=True)
-        return sorted_players
+        ranked_players = []
+        for (player_idx, player_row), match_score in zip(page_players.iterrows(), page_scores):
+            if birth_dates:
+                age_field = ("Birth Date", player_row['birthDate'].date().isoformat() if pd.notna(player_row['birthDate']) else None)
+            else:
+                age_field = ("Age", int(player_row['age']) if pd.notna(player_row['age']) else "N/A")
+            ranked_players.append({
+                "Player Name": player_row['full_name'],
+                age_field[0]: age_field[1],
+                "Current Club": player_row['teams.name'],
+                "Match Score": float(match_score),
+                "Key Strengths": key_strengths.get(player_idx, "")
+            })
+        return ranked_players
 
 # --- Main execution block for testing ---
 if __name__ == "__main__":
@@ -2,33 +2,12 @@
 import streamlit as st
 import pandas as pd
 import json
-from player_analyzer import PlayerAnalyzer, PLAYERS_STATS_FILE, PLAYERS_PHYSICAL_FILE
-from match_finder import MatchFinder
 import base64
-from weasyprint import HTML
-
-# --- Helper Functions ---
-@st.cache_data
-def load_all_data(stats_path, crests_path):
-    """Loads player stats and club crests data."""
-    try:
-        players_df = pd.read_csv(stats_path, na_values=[''])
-        players_df['full_name'] = players_df['firstName'] + ' ' + players_df['lastName']
-        crests_df = pd.read_csv(crests_path)
-        crest_dict = pd.Series(crests_df.crest_url.values,index=crests_df.club_name_official).to_dict()
-        return players_df, crest_dict
-    except FileNotFoundError:
-        return None, None
-
-@st.cache_resource
-def get_services():
-    """Initializes and returns both the PlayerAnalyzer and MatchFinder."""
-    analyzer = PlayerAnalyzer(stats_path=PLAYERS_STATS_FILE, physical_path=PLAYERS_PHYSICAL_FILE)
-    finder = MatchFinder(
-        club_profiles_path='./data/processed/club_profiles_final.json',
-        player_analyzer=analyzer
-    )
-    return analyzer, finder
+from report_renderer import pdf_download_button
+from player_analyzer import KPI_FORMATED_NAMES
+from report_templates import crest_url_for, generate_report_html, top_skills
+from asset_cache import inline_asset
+from data_service import get_data_service
 
 #@st.cache_resource
 #def get_player_analyzer():
@@ -38,85 +17,6 @@ def get_services():
 #def get_match_finder():
 #    return MatchFinder(club_profiles_path='./data/processed/club_profiles_final.json')
 
-# This mapping connects our clean system names to the names scraped from the official site.
-OFFICIAL_NAME_MAPPING = {
-    "Dinamo Bucuresti": "Dinamo Bucuresti", "FCS Bucuresti": "Fcsb",
-    "Rapid Bucuresti": "Fc Rapid Bucuresti", "Otelul": "Otelul Galati",
-    "CFR Cluj": "Cfr Cluj", "Botosani": "Fc Botosani",
-    "Unirea Slobozia": "Unirea Slobozia", "Universitatea Craiova": "Universitatea Craiova",
-    "UTA Arad": "Uta Arad", "Hermannstadt": "Afc Hermannstadt",
-    "Universitatea Cluj": "Fc Universitatea Cluj", "Petrolul 52": "Petrolul Ploiesti",
-    "Farul Constanta": "Fc Farul Constanta","FC Arges": "ACSC FC Arges",
-    "Csikszereda Miercurea Ciuc": "Fk Csikszereda",
-    "Metaloglobus Bucuresti": "FC Metaloglobus Bucharest"
-}
-
-KPI_FORMATED_NAMES = {
-    # Forward KPIs
-    'total.goals': 'Total Goals',
-    'percent.goalConversion': 'Goal Conversion %',
-    'total.xgShot': 'Expected Goals (xG)',
-    'Count Sprint': 'Total Sprints',
-    
-    # Midfielder KPIs
-    'percent.successfulPasses': 'Passing Accuracy %',
-    'total.passesToFinalThird': 'Passes to Final Third',
-    'total.duelsWon': 'Total Duels Won',
-    'Total Distance': 'Distance Covered (m)',
-    'High Intensity (HI) Distance': 'High Intensity Distance (m)',
-
-    # Defender KPIs
-    'percent.defensiveDuelsWon': 'Defensive Duels Won %',
-    'total.interceptions': 'Total Interceptions',
-    'percent.aerialDuelsWon': 'Aerial Duels Won %',
-    'Count High Acceleration': 'Total High Accelerations',
-
-    # Universal KPIs
-    'Max Speed': 'Max Speed (km/h)',
-    'total.progressivePasses': 'Progressive Passes'
-    # Add any other skills you want to rename here
-}
-
-# Add this function near the top of your file
-def generate_report_html(player_name, age, pos, top_skills, match_data, crest_url):
-    """Generates a clean HTML string for the printable report."""
-    
-    skills_html = "".join([f"<li><b>{skill.replace('.', ' ').title()}:</b> Top {100-percentile:.0f}%</li>" for skill, percentile in top_skills])
-    
-    drivers_html = "".join([f"<li>✅ {driver}</li>" for driver in match_data['reason'].split(' | ')])
-
-    report = f"""
-    <html>
-        <head>
-            <style>
-                body {{ font-family: sans-serif; }}
-                .report-container {{ border: 1px solid #ddd; padding: 20px; border-radius: 10px; }}
-                .header {{ display: flex; align-items: center; border-bottom: 2px solid #eee; padding-bottom: 10px; }}
-                .header img {{ width: 70px; margin-right: 20px; }}
-                h1 {{ margin: 0; }}
-                h2 {{ border-bottom: 1px solid #eee; padding-bottom: 5px; }}
-            </style>
-        </head>
-        <body>
-            <div class="report-container">
-                <div class="header">
-                    <img src="{crest_url}">
-                    <div>
-                        <h1>Player-Club Fit Analysis</h1>
-                        <p><strong>Player:</strong> {player_name} | <strong>Position:</strong> {pos} | <strong>Age:</strong> {age}</p>
-                    </div>
-                </div>
-                <h2>Top Match: {match_data['club_name']} (Score: {match_data['match_score']:.1f})</h2>
-                <h3>Key Strengths</h3>
-                <ul>{skills_html}</ul>
-                <h3>Key Match Drivers</h3>
-                <ul>{drivers_html}</ul>
-            </div>
-        </body>
-    </html>
-    """
-    return report
-
 # --- Main App ---
 st.title("Player Analysis & Opportunity Finder")
 
@@ -166,14 +66,13 @@ if 'success_message' in st.session_state:
     # Clear the message so it doesn't reappear on the next interaction
     del st.session_state.success_message
 
-players_df, crest_dict = load_all_data(
-    stats_path='./data/processed/players_manually_enriched.csv',
-    crests_path='./data/processed/club_crests.csv'
-)
 #analyzer = get_player_analyzer()
 #match_finder = get_match_finder()
 
-analyzer, match_finder = get_services()
+# One analyzer, finder and crest map shared by all pages (read-only views)
+data_service = get_data_service()
+analyzer, match_finder = data_service.analyzer, data_service.finder
+players_df, crest_dict = data_service.players_df, data_service.crest_dict
 
 if players_df is not None and crest_dict is not None:
     st.header("1. Select Player to Analyze")
@@ -183,9 +82,7 @@ if players_df is not None and crest_dict is not None:
     if selected_player_name:
         player_data = players_df[players_df['full_name'] == selected_player_name].iloc[0]
         pos = player_data['positions.position.name']
-        today = pd.to_datetime('today')
-        birth_date = pd.to_datetime(player_data['birthDate'])
-        age = int((today - birth_date).days / 365.25)
+        age = int(player_data['age']) if pd.notna(player_data['age']) else "N/A"
 
         st.subheader("Player Profile:")
 
@@ -204,13 +101,13 @@ if players_df is not None and crest_dict is not None:
         col1, col2 = st.columns(2)
         with col1:
             st.markdown(f'''<div style="text-align: center;">
-                <img src="https://cdn-icons-png.flaticon.com/512/1106/1106944.png" width="40">
+                <img src="{inline_asset("https://cdn-icons-png.flaticon.com/512/1106/1106944.png")}" width="40">
                 <p style="font-size: 0.9em; color: gray; font-weight: bold; text-transform: uppercase; margin: 0;">Position</p>
                 <p style="font-size: 1.2em; font-weight: bold; margin: 0;">{pos}</p>
             </div>''', unsafe_allow_html=True)
         with col2:
             st.markdown(f'''<div style="text-align: center;">
-                <img src="https://cdn-icons-png.flaticon.com/512/3333/3333673.png" width="40">
+                <img src="{inline_asset("https://cdn-icons-png.flaticon.com/512/3333/3333673.png")}" width="40">
                 <p style="font-size: 0.9em; color: gray; font-weight: bold; text-transform: uppercase; margin: 0;">Age</p>
                 <p style="font-size: 1.2em; font-weight: bold; margin: 0;">{age} Years</p>
             </div>''', unsafe_allow_html=True)
@@ -223,8 +120,7 @@ if players_df is not None and crest_dict is not None:
         analysis_results = analyzer.get_player_analysis(first_name, last_name)
         
         if analysis_results and 'analysis' in analysis_results:
-            percentiles = {kpi: data['percentile'] for kpi, data in analysis_results['analysis'].items()}
-            top_3_skills = sorted(percentiles.items(), key=lambda item: item[1], reverse=True)[:3]
+            top_3_skills = top_skills(analysis_results, n=3)
             skills_html = "<ul>"
             for skill, percentile in top_3_skills:
                 formated_skill_name_name = KPI_FORMATED_NAMES.get(skill, skill.replace('.', ' ').title())
@@ -262,8 +158,7 @@ if players_df is not None and crest_dict is not None:
                         # ---  UI LOGIC ---
             
                         # 1. Gather all data for the card
-                        official_name = OFFICIAL_NAME_MAPPING.get(match['club_name'])
-                        crest_url = crest_dict.get(official_name, "https://i.imgur.com/8f2E3s3.png")
+                        crest_url = crest_url_for(match['club_name'], crest_dict)
 
                         drivers = match['reason'].split(' | ')
                         highlight_driver = match.get('highlight_driver') # Get the driver to highlight, if it exists
@@ -314,8 +209,7 @@ if players_df is not None and crest_dict is not None:
                         col1_share, col2_share, col3_share = st.columns([1, 2, 1])
                         with col2_share:
                             if st.button("Share Report", key=f"share_{match['club_name']}"):
-                                official_name = OFFICIAL_NAME_MAPPING.get(match['club_name'])
-                                crest = crest_dict.get(official_name, "https://i.imgur.com/8f2E3s3.png")
+                                crest = crest_url_for(match['club_name'], crest_dict)
             
                                 # Generate the HTML for this specific match
                                 report_html = generate_report_html(
@@ -339,15 +233,10 @@ if players_df is not None and crest_dict is not None:
                     # --- DOWNLOAD LOGIC ---
                     _ , col_center, _ = st.columns([1, 2, 1]) # Use columns to center the container
                     with col_center:
-                        # 1. Convert the HTML report to a PDF in memory
-                        pdf_bytes = HTML(string=st.session_state.report_to_show).write_pdf()
-                    
-                        # 2. Create a download button for the PDF
-                        st.download_button(
-                            label="📄 Download as PDF",
-                            data=pdf_bytes,
+                        # Offered once the background render has finished (cached by the report's content)
+                        pdf_download_button(
+                            st.session_state.report_to_show,
                             file_name=f"player_report_{st.session_state.get('show_matches_for_player', 'report').replace(' ', '_')}.pdf",
-                            mime="application/pdf",
                             use_container_width=True
                         )
                         
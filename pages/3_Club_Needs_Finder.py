@@ -2,20 +2,13 @@
 import streamlit as st
 import pandas as pd
 import base64
-from weasyprint import HTML
-from match_finder import MatchFinder
-from player_analyzer import PlayerAnalyzer, PLAYERS_STATS_FILE, PLAYERS_PHYSICAL_FILE
+from report_renderer import pdf_download_button
+from report_templates import generate_player_report_html
+from data_service import get_data_service
 
-# --- Cache resources to load them only once ---
-@st.cache_resource
-def get_analyzer_and_finder():
-    """Initializes both the PlayerAnalyzer and MatchFinder."""
-    analyzer = PlayerAnalyzer(stats_path=PLAYERS_STATS_FILE, physical_path=PLAYERS_PHYSICAL_FILE)
-    finder = MatchFinder(
-        club_profiles_path='./data/processed/club_profiles_final.json',
-        player_analyzer=analyzer
-    )
-    return finder
+# The top recommendations are shown first, the rest of the ranking is paged in below them
+TOP_RECOMMENDATIONS = 5
+PLAYERS_PER_PAGE = 20
 
 @st.cache_data
 def get_club_and_position_lists(_finder):
@@ -24,54 +17,6 @@ def get_club_and_position_lists(_finder):
     position_list = ['Defender', 'Midfielder', 'Forward']
     return club_list, position_list
 
-def generate_player_report_html(results_df, club_name, position):
-    """Generates a clean HTML string for the player recommendations report."""
-    
-    # Prepare the data for display
-    results_df['Key Strengths'] = results_df['Key Strengths'].apply(
-        lambda x: "<ul style='padding-left: 15px; margin: 0; text-align: left;'>" + 
-                  "".join([f"<li>{s.strip()}</li>" for s in x.split('|')]) + 
-                  "</ul>"
-    )
-    results_df['Match Score'] = results_df['Match Score'].map('{:.2f}'.format)
-    if "Rank" not in results_df.columns:
-        results_df.insert(0, "Rank", range(1, 1 + len(results_df)))
-
-    top_5_html = results_df.head(5).style.hide(axis="index").to_html(escape=False)
-    remaining_html = results_df.iloc[5:].style.hide(axis="index").to_html(escape=False)
-
-    report = f"""
-    <html>
-        <head>
-            <style>
-                body {{ font-family: sans-serif; color: #333; }}
-                .report-container {{ border: 1px solid #ddd; padding: 20px; border-radius: 10px; max-width: 900px; margin: auto; }}
-                .header {{ display: flex; align-items: center; border-bottom: 2px solid #eee; padding-bottom: 10px; margin-bottom: 10px; }}
-                h1 {{ margin: 0; font-size: 24px; }}
-                h2 {{ border-bottom: 1px solid #eee; padding-bottom: 5px; color: #00529B; }}
-                table {{ width: 100%; border-collapse: collapse; }}
-                th, td {{ padding: 8px; text-align: left; border-bottom: 1px solid #ddd; }}
-                th {{ background-color: #f2f2f2; }}
-            </style>
-        </head>
-        <body>
-            <div class="report-container">
-                <div class="header">
-                    <h1>Talent Finder Report</h1>
-                </div>
-                <p><strong>Club Searched:</strong> {club_name} | <strong>Position of Need:</strong> {position}</p>
-                
-                <h2>Top 5 Recommendations</h2>
-                {top_5_html}
-                
-                <h2>Best of the Rest</h2>
-                {remaining_html}
-            </div>
-        </body>
-    </html>
-    """
-    return report
-
 # --- Main App UI ---
 st.title("Club Needs & Talent Finder")
 
@@ -94,7 +39,13 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-finder = get_analyzer_and_finder()
+# The analyzer and finder are shared with the other pages through the data service;
+# rankings are served from its precomputed talent index
+data_service = get_data_service()
+finder, talent_index = data_service.finder, data_service.talent_index
+if finder is None or not finder.club_profiles:
+    st.info("Please run the data processing pipeline to generate the required files.")
+    st.stop()
 club_list, position_list = get_club_and_position_lists(finder)
 
 st.header("1. Define Recruitment Profile")
@@ -108,11 +59,19 @@ with col2:
 if st.button("Find Best Player Matches", use_container_width=True, type="primary"):
     if selected_club and selected_position:
         with st.spinner(f"Analyzing all {selected_position}s for {selected_club}..."):
-            best_players = finder.find_best_players_for_club(selected_club, selected_position)
+            players_requested = TOP_RECOMMENDATIONS + PLAYERS_PER_PAGE
+            best_players = talent_index.get(selected_club, selected_position, top_k=players_requested)
             # Save results to session state to persist them across reruns
             st.session_state.best_players_results = best_players
+            st.session_state.more_players_available = len(best_players) == players_requested
             st.session_state.selected_club_for_report = selected_club
             st.session_state.selected_position_for_report = selected_position
+            # Built once per search: the report covers the whole ranking, not just the rows loaded on screen
+            st.session_state.talent_report_html = generate_player_report_html(
+                pd.DataFrame(talent_index.get(selected_club, selected_position)),
+                selected_club,
+                selected_position
+            )
 
 # --- This block now handles displaying the results AND the download button ---
 if 'best_players_results' in st.session_state:
@@ -127,17 +86,11 @@ if 'best_players_results' in st.session_state:
         with col1_header:
             st.header("Top Player Recommendations")
         with col2_header:
-            report_html = generate_player_report_html(
-                pd.DataFrame(best_players).copy(),
-                st.session_state.selected_club_for_report,
-                st.session_state.selected_position_for_report
-            )
-            pdf_bytes = HTML(string=report_html).write_pdf()
-            st.download_button(
+            # Rendered in the background on request and offered once ready (cached by the report's content)
+            pdf_download_button(
+                st.session_state.talent_report_html,
                 label="📄 Download Report",
-                data=pdf_bytes,
-                file_name=f"talent_finder_{st.session_state.selected_club_for_report.replace(' ', '_')}.pdf",
-                mime="application/pdf",
+                file_name=f"talent_finder_{st.session_state.selected_club_for_report.replace(' ', '_')}.pdf"
             )
         
         # 1. Prepare the full DataFrame for display
@@ -167,5 +120,18 @@ if 'best_players_results' in st.session_state:
                 remaining_df.style.format({"Match Score": "{:.2f}"}).hide(axis="index").to_html(escape=False),
                 unsafe_allow_html=True
             )
+
+        # 6. Page in the next players straight from the precomputed ranking
+        if st.session_state.get('more_players_available'):
+            if st.button("Show More Players", use_container_width=True):
+                next_page = talent_index.get(
+                    st.session_state.selected_club_for_report,
+                    st.session_state.selected_position_for_report,
+                    top_k=PLAYERS_PER_PAGE,
+                    offset=len(best_players)
+                )
+                st.session_state.best_players_results = best_players + next_page
+                st.session_state.more_players_available = len(next_page) == PLAYERS_PER_PAGE
+                st.rerun()
     else:
         st.warning("No suitable players found for the selected criteria.")
\ No newline at end of file
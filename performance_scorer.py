@@ -1,6 +1,9 @@
 # performance_scorer.py
 
-from player_analyzer import PlayerAnalyzer, PLAYERS_STATS_FILE, PLAYERS_PHYSICAL_FILE
+import numpy as np
+import numpy.ma as ma
+import pandas as pd
+from player_analyzer import PlayerAnalyzer, PLAYERS_STATS_FILE, PLAYERS_PHYSICAL_FILE, KPI_COLUMNS
 from collections import Counter
 
 # This dictionary defines the WEIGHTS for our KPIs for each position.
@@ -29,6 +32,20 @@ KPI_WEIGHTS = {
     }
 }
 
+def build_weight_matrix(kpi_columns: list = KPI_COLUMNS) -> tuple:
+    """
+    KPI_WEIGHTS as a (position groups x KPIs) matrix whose columns line up with the analyzer's
+    percentile matrix. Returns the group names (row order) and the matrix; unweighted KPIs are 0.
+    """
+    kpi_index = {kpi: j for j, kpi in enumerate(kpi_columns)}
+    position_groups = list(KPI_WEIGHTS)
+    weight_matrix = np.zeros((len(position_groups), len(kpi_columns)))
+    for i, position_group in enumerate(position_groups):
+        for kpi, weight in KPI_WEIGHTS[position_group].items():
+            if kpi in kpi_index:
+                weight_matrix[i, kpi_index[kpi]] = weight
+    return position_groups, weight_matrix
+
 class PlayerPerformanceScorer:
     def __init__(self, analyzer: PlayerAnalyzer):
         """
@@ -71,6 +88,53 @@ class PlayerPerformanceScorer:
 
         return normalized_score
 
+    def score_all(self) -> pd.Series:
+        """
+        Performance score of every player in one pass: the weight matrix row of each player's
+        position group applied to the analyzer's percentile matrix. Missing KPIs are masked out
+        and the remaining weights renormalized, as in calculate_performance_score.
+        Indexed like players_df; players of groups without KPI weights get NaN.
+        """
+        position_groups, weight_matrix = build_weight_matrix(KPI_COLUMNS)
+        group_rows = self.analyzer.players_df['position_group'].astype(object).map(
+            {position_group: i for i, position_group in enumerate(position_groups)}
+        )
+        has_weights = group_rows.notna().to_numpy()
+
+        # Each player's weights, with KPIs they have no percentile for masked out
+        percentiles = ma.masked_invalid(self.analyzer.percentile_matrix[has_weights].astype(np.float64))
+        weights = ma.array(weight_matrix[group_rows[has_weights].astype(int).to_numpy()], mask=ma.getmaskarray(percentiles))
+
+        weighted_sum = (percentiles * weights).sum(axis=1).filled(0)
+        total_weight = weights.sum(axis=1).filled(0)
+
+        scores = np.full(len(self.analyzer.players_df), np.nan)
+        scores[has_weights] = np.divide(weighted_sum, total_weight, out=np.zeros_like(weighted_sum), where=total_weight > 0)
+        return pd.Series(scores, index=self.analyzer.players_df.index, name='performance_score')
+
+    def leaderboard(self, position_group: str | None = None, top_n: int | None = None) -> pd.DataFrame:
+        """
+        Ranked league table of performance scores, optionally for one position group and/or
+        cut to the top_n players. Ties keep the analyzer's player order.
+        """
+        players = self.analyzer.players_df
+        table = pd.DataFrame({
+            'full_name': players['full_name'],
+            'team': players['teams.name'].astype(object),
+            'position_name': players['positions.position.name'].astype(object),
+            'position_group': players['position_group'].astype(object),
+            'performance_score': self.score_all()
+        }).dropna(subset=['performance_score'])
+
+        if position_group is not None:
+            table = table[table['position_group'] == position_group]
+        table = table.sort_values(by='performance_score', ascending=False, kind='stable')
+        if top_n is not None:
+            table = table.head(top_n)
+
+        table.insert(0, 'rank', np.arange(1, len(table) + 1))
+        return table.reset_index(drop=True)
+
 # --- Main execution block ---
 if __name__ == "__main__":
     # 1. First, create an instance of our analyzer
@@ -88,4 +152,8 @@ if __name__ == "__main__":
         analyzer.display_analysis(first_name, last_name)
         
         print(f"\n--- 📈 Final Calculated Performance Score ---")
-        print(f"Overall Score for {first_name} {last_name}: {score:.1f}")
\ No newline at end of file
+        print(f"Overall Score for {first_name} {last_name}: {score:.1f}")
+
+    # 4. The same scores for the whole league, as a ranked table
+    print(f"\n--- 🏆 League Leaderboard (Top 10) ---")
+    print(scorer.leaderboard(top_n=10).to_string(index=False, float_format='{:.1f}'.format))
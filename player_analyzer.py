@@ -1,8 +1,13 @@
 # player_analyzer.py (Refactored for Modularity)
 
+import numpy as np
+import hashlib
 import pandas as pd
 import os
 import unicodedata
+from functools import partial
+from data_cache import read_csv_cached, source_version
+from schema import PLAYER_COLUMNS, SCHEMA_DTYPES, add_ages, available_columns, compact_frame, reference_date
 
 KPI_FORMATED_NAMES = {
     # Forward KPIs
@@ -49,10 +54,18 @@ POSITION_KPIS = {
     ]
 }
 
+# Every KPI used by any position group, in a fixed order (columns of the percentile matrix)
+KPI_COLUMNS = list(dict.fromkeys(kpi for kpis in POSITION_KPIS.values() for kpi in kpis))
+
 def normalize_text(text: str) -> str:
     if not isinstance(text, str): return text
     return "".join(c for c in unicodedata.normalize('NFD', text) if unicodedata.category(c) != 'Mn')
 
+def name_key(full_name: str) -> str:
+    """Accent-, case- and whitespace-insensitive key used to look players up by name."""
+    if not isinstance(full_name, str): return full_name
+    return " ".join(normalize_text(full_name).casefold().split())
+
 def get_position_group(player_position: str) -> str:
     if 'Back' in player_position or 'Defender' in player_position: return 'Defender'
     if 'Midfielder' in player_position: return 'Midfielder'
@@ -66,10 +79,20 @@ def get_position_group(player_position: str) -> str:
     return 'Other'
 
 class PlayerAnalyzer:
-    def __init__(self, stats_path: str, physical_path: str):
+    def __init__(self, stats_path: str, physical_path: str, cache_dir: str | None = None, as_of=None):
+        """
+        Loads and merges the player stats and physical metrics, keeping only the columns the analysis uses.
+        With a cache_dir, the parsed CSVs are kept there as columnar files and reused until the CSVs change.
+        Ages are measured against as_of (default: the day the data is loaded), pinned for the analyzer's lifetime.
+        """
         try:
-            stats_df = pd.read_csv(stats_path, na_values=[''])
-            physical_df = pd.read_csv(physical_path, na_values=[''])
+            read_csv = partial(read_csv_cached, cache_dir=cache_dir) if cache_dir else pd.read_csv
+
+            # Only the columns the analysis uses are loaded, in the compact schema
+            stats_columns = available_columns(stats_path, PLAYER_COLUMNS + KPI_COLUMNS)
+            physical_columns = available_columns(physical_path, ['player_name'] + KPI_COLUMNS)
+            stats_df = compact_frame(read_csv(stats_path, usecols=stats_columns, dtype=SCHEMA_DTYPES, na_values=['']))
+            physical_df = compact_frame(read_csv(physical_path, usecols=physical_columns, dtype=SCHEMA_DTYPES, na_values=['']))
             
             stats_df['normalized_name'] = stats_df['shortName'].apply(normalize_text)
             physical_df['normalized_name'] = physical_df['player_name'].apply(normalize_text)
@@ -82,34 +105,82 @@ class PlayerAnalyzer:
             merged_df['full_name'] = merged_df['firstName'] + ' ' + merged_df['lastName']
 
             # 3. Sort by minutes played to prioritize a player's main position
-            merged_df.sort_values(by='total.minutesOnField', ascending=False, inplace=True)
+            # (sorted as float64 so ties keep the same order whatever width the compact column has)
+            merged_df.sort_values(by='total.minutesOnField', ascending=False, inplace=True, key=lambda minutes: minutes.astype('float64'))
             
             # 3. Drop duplicates, keeping only the first (most played) entry for each player
-            self.players_df = merged_df.drop_duplicates(subset='full_name', keep='first').copy()
+            self.players_df = merged_df.drop_duplicates(subset='full_name', keep='first').reset_index(drop=True)
             
             # 4. Now create the final columns on the de-duplicated dataframe
             self.players_df['position_group'] = self.players_df['positions.position.name'].apply(get_position_group)
+            self.reference_date = reference_date(as_of)
+            add_ages(self.players_df, self.reference_date)
+            compact_frame(self.players_df)
+
+            # 5. Index players by normalized name so lookups don't scan the whole table
+            self._build_name_index()
+
+            # 6. Rank every player against their position group once, up front
+            self._build_percentile_matrix()
+            # Identifies the player data this analyzer was built from (changes whenever either CSV does; ages are
+            # derived when served, so the reference date is not part of it). Reuses the content hashes
+            # read_csv_cached took while loading, so the CSVs aren't read again just to version them.
+            self.data_version = hashlib.sha1(
+                (source_version(stats_path) + source_version(physical_path)).encode('utf-8')
+            ).hexdigest()
 
             print("✅ Player stats and physical data loaded, de-duplicated, and merged successfully.")
             
         except FileNotFoundError as e:
             raise FileNotFoundError(f"ERROR: A data file was not found. Details: {e}")
 
+    def _build_name_index(self):
+        """
+        Maps each normalized 'first last' name to its row position in players_df.
+        If two players normalize to the same name, the one with the highest position share wins.
+        """
+        has_name = self.players_df['firstName'].notna() & self.players_df['lastName'].notna()
+        named_players = self.players_df[has_name]
+        lookup = pd.DataFrame({
+            'key': (named_players['firstName'] + ' ' + named_players['lastName']).map(name_key),
+            'percent': named_players['positions.percent']
+        })
+        lookup = lookup.sort_values(by='percent', ascending=False, kind='stable').drop_duplicates(subset='key', keep='first')
+        self.name_index = dict(zip(lookup['key'], lookup.index))
+
+    def _build_percentile_matrix(self):
+        """
+        Computes the percentile of every POSITION_KPIS metric for every player in one pass.
+        Row i belongs to players_df row i and column j to KPI_COLUMNS[j]. A percentile is the
+        share of position-group peers with a strictly lower value; KPIs outside the player's
+        group, or with no value, are NaN.
+        """
+        self.kpi_index = {kpi: j for j, kpi in enumerate(KPI_COLUMNS)}
+        self.percentile_matrix = np.full((len(self.players_df), len(KPI_COLUMNS)), np.nan, dtype=np.float32)
+
+        group_rows = self.players_df.groupby('position_group', observed=True).indices
+        for position_group, kpis in POSITION_KPIS.items():
+            rows = group_rows.get(position_group)
+            if rows is None: continue
+            for kpi in kpis:
+                if kpi not in self.players_df.columns: continue
+                peer_values = self.players_df[kpi].iloc[rows]
+                worse_peers = peer_values.rank(method='min') - 1
+                total_peers = peer_values.count()
+                if total_peers == 0: continue
+                self.percentile_matrix[rows, self.kpi_index[kpi]] = (worse_peers / total_peers * 100).to_numpy(dtype=np.float32)
+
     def get_player_analysis(self, first_name: str, last_name: str) -> dict | None:
         """
         Performs a full analysis of a single player and returns the data.
         """
-        normalized_full_name = normalize_text(f"{first_name} {last_name}")
+        row_position = self.name_index.get(name_key(f"{first_name} {last_name}"))
         
-        self.players_df['temp_full_name'] = (self.players_df['firstName'].apply(normalize_text) + ' ' + self.players_df['lastName'].apply(normalize_text))
-
-        player_data = self.players_df[self.players_df['temp_full_name'] == normalized_full_name]
-        
-        if player_data.empty:
+        if row_position is None:
             print(f"❌ Player '{first_name} {last_name}' not found.")
             return None
 
-        player_primary_position = player_data.sort_values(by='positions.percent', ascending=False).iloc[0]
+        player_primary_position = self.players_df.iloc[row_position]
         position_name = player_primary_position['positions.position.name']
         position_group = get_position_group(position_name)
 
@@ -117,7 +188,7 @@ class PlayerAnalyzer:
             return None
         
         kpis_to_check = POSITION_KPIS[position_group]
-        peer_df = self.players_df[self.players_df['positions.position.name'].apply(get_position_group) == position_group]
+        player_percentiles = self.percentile_matrix[row_position]
 
         player_analysis = {}
         for kpi in kpis_to_check:
@@ -125,14 +196,7 @@ class PlayerAnalyzer:
                 continue
 
             player_value = player_primary_position[kpi]
-            peer_values = peer_df[kpi].dropna()
-            total_peers = len(peer_values)
-            
-            if total_peers == 0: percentile = 0
-            else:
-                worse_peers = (peer_values < player_value).sum()
-                percentile = (worse_peers / total_peers) * 100
-            
+            percentile = float(player_percentiles[self.kpi_index[kpi]])
             player_analysis[kpi] = {"value": player_value, "percentile": percentile}
 
         # Return all the calculated data in a dictionary
@@ -143,6 +207,63 @@ class PlayerAnalyzer:
             "analysis": player_analysis
         }
 
+    def _select_players(self, names: list | None = None, position_group: str | None = None, player_rows: list | None = None) -> pd.DataFrame:
+        """
+        Selects rows of players_df by full name, row position and/or position group (all players if none is given).
+        Rows are selected by label (players_df has a RangeIndex), so names and player_rows combine as an intersection.
+        """
+        players = self.players_df
+        if player_rows is not None:
+            players = players.loc[list(dict.fromkeys(player_rows))]
+        if names is not None:
+            rows = dict.fromkeys(self.name_index[key] for key in map(name_key, names) if key in self.name_index)
+            players = players.loc[[row for row in rows if row in players.index]]
+        if position_group is not None:
+            players = players[players['position_group'] == position_group]
+        return players
+
+    def get_player_analyses(self, names: list | None = None, position_group: str | None = None, player_rows: list | None = None) -> pd.DataFrame:
+        """
+        Batch counterpart of get_player_analysis: analyzes many players in one vectorized pass.
+        Select players by full name ("First Last"), by position group, by players_df row position,
+        or pass none of them for the whole league.
+        Returns one row per (player, KPI) with columns player_idx (row in players_df), full_name,
+        position_name, position_group, kpi, value and percentile. As in get_player_analysis,
+        KPIs without a value are left out.
+        """
+        players = self._select_players(names, position_group, player_rows)
+
+        group_frames = []
+        for group, kpis in POSITION_KPIS.items():
+            group_players = players[players['position_group'] == group]
+            kpis = [kpi for kpi in kpis if kpi in players.columns]
+            if group_players.empty or not kpis: continue
+            rows = group_players.index.to_numpy()
+            kpi_positions = [self.kpi_index[kpi] for kpi in kpis]
+            group_frames.append(pd.DataFrame({
+                'player_idx': np.repeat(rows, len(kpis)),
+                'kpi': np.tile(kpis, len(rows)),
+                'value': group_players[kpis].to_numpy(dtype=float).ravel(),
+                'percentile': self.percentile_matrix[np.ix_(rows, kpi_positions)].ravel()
+            }))
+
+        columns = ['player_idx', 'full_name', 'position_name', 'position_group', 'kpi', 'value', 'percentile']
+        if not group_frames:
+            return pd.DataFrame(columns=columns)
+
+        analyses = pd.concat(group_frames, ignore_index=True)
+        analyses = analyses[analyses['value'].notna()]
+
+        # Restore the order in which the players were selected
+        player_order = pd.Series(np.arange(len(players)), index=players.index)
+        analyses = analyses.iloc[np.argsort(player_order.loc[analyses['player_idx']].to_numpy(), kind='stable')]
+
+        player_info = self.players_df.loc[analyses['player_idx']]
+        analyses['full_name'] = player_info['full_name'].to_numpy()
+        analyses['position_name'] = player_info['positions.position.name'].to_numpy()
+        analyses['position_group'] = player_info['position_group'].to_numpy()
+        return analyses[columns].reset_index(drop=True)
+
     def display_analysis(self, first_name: str, last_name: str):
         """
         Gets player analysis data and prints a formatted summary to the console.
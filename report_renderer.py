@@ -0,0 +1,241 @@
+# report_renderer.py
+
+import hashlib
+import multiprocessing
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from weasyprint import CSS, HTML, default_url_fetcher
+from weasyprint.text.fonts import FontConfiguration
+
+# Upper bound on the PDF bytes kept in memory; least recently used reports are evicted first
+DEFAULT_MAX_CACHE_BYTES = 64 * 1024 * 1024
+# Renders running at once across all sessions; further jobs wait in the pool's queue
+DEFAULT_RENDER_WORKERS = min(4, os.cpu_count() or 1)
+# How often a page checks whether its PDF is ready (seconds)
+POLL_INTERVAL_SECONDS = 1.0
+
+def html_key(report_html: str) -> str:
+    """Cache key of a report: the SHA-256 of its HTML."""
+    return hashlib.sha256(report_html.encode('utf-8')).hexdigest()
+
+# --- Per-process rendering resources, reused across documents ---
+# Both caches are LRUs: the least recently used entry is dropped once a cache is full
+MAX_STYLESHEETS = 16
+MAX_FETCHED_URLS = 256
+_font_config = None
+_stylesheets = OrderedDict()   # CSS text -> parsed stylesheet
+_fetched_urls = OrderedDict()  # URL -> fetched resource (crests are shared by many reports)
+_resources_lock = threading.Lock()
+
+def _get_font_config() -> FontConfiguration:
+    global _font_config
+    if _font_config is None:
+        _font_config = FontConfiguration()
+    return _font_config
+
+def _lru_get(cache: OrderedDict, key):
+    with _resources_lock:
+        value = cache.get(key)
+        if value is not None:
+            cache.move_to_end(key)
+        return value
+
+def _lru_put(cache: OrderedDict, key, value, max_entries: int):
+    with _resources_lock:
+        cache[key] = value
+        cache.move_to_end(key)
+        while len(cache) > max_entries:
+            cache.popitem(last=False)
+
+def _get_stylesheet(css: str) -> CSS:
+    stylesheet = _lru_get(_stylesheets, css)
+    if stylesheet is None:
+        stylesheet = CSS(string=css, font_config=_get_font_config())
+        _lru_put(_stylesheets, css, stylesheet, MAX_STYLESHEETS)
+    return stylesheet
+
+def _cached_url_fetcher(url: str, *args, **kwargs) -> dict:
+    """default_url_fetcher that keeps what it fetched, so each image is downloaded once per process."""
+    resource = _lru_get(_fetched_urls, url)
+    if resource is None:
+        resource = default_url_fetcher(url, *args, **kwargs)
+        if 'file_obj' in resource:
+            with resource.pop('file_obj') as file_obj:
+                resource['string'] = file_obj.read()
+        _lru_put(_fetched_urls, url, resource, MAX_FETCHED_URLS)
+    return dict(resource)
+
+def render_document(report_html: str, css: str | None = None):
+    """
+    Lays out report HTML as a WeasyPrint document. Fonts, fetched images and the optional
+    extra stylesheet are parsed once per process and reused for every document.
+    """
+    stylesheets = [_get_stylesheet(css)] if css else None
+    html = HTML(string=report_html, url_fetcher=_cached_url_fetcher)
+    return html.render(stylesheets=stylesheets, font_config=_get_font_config())
+
+def render_pdf_bytes(report_html: str, css: str | None = None) -> bytes:
+    """Renders report HTML to PDF bytes (runs in the worker processes)."""
+    return render_document(report_html, css).write_pdf()
+
+class ReportRenderer:
+    def __init__(self, max_cache_bytes: int = DEFAULT_MAX_CACHE_BYTES, max_workers: int = DEFAULT_RENDER_WORKERS):
+        """
+        Renders report HTML to PDF with WeasyPrint and keeps the bytes in an LRU cache keyed
+        by the HTML's hash, so the same report is only rendered once.
+        Jobs run in a process pool so pages never block on WeasyPrint; the renderer is shared
+        by every Streamlit session, hence the lock.
+        """
+        self.max_cache_bytes = max_cache_bytes
+        self.max_workers = max_workers
+        self._pdfs = OrderedDict()
+        self._cache_bytes = 0
+        self._jobs = {}     # key -> Future of a render in progress
+        self._errors = {}   # key -> error message of a failed render
+        self._executor = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        # Created on first use; 'spawn' because forking the threaded Streamlit server is unsafe
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=multiprocessing.get_context('spawn'))
+        return self._executor
+
+    def submit(self, report_html: str, retry: bool = False) -> str:
+        """
+        Queues a background render of this HTML and returns its key for job_status/get_pdf.
+        Nothing is queued if the PDF is cached or already being rendered; a failed render is
+        only queued again with retry=True.
+        """
+        key = html_key(report_html)
+        with self._lock:
+            if key in self._pdfs:
+                self.hits += 1
+                self._pdfs.move_to_end(key)
+                return key
+            if key in self._jobs or (key in self._errors and not retry):
+                return key
+            self.misses += 1
+            self._errors.pop(key, None)
+            future = self._get_executor().submit(render_pdf_bytes, report_html)
+            self._jobs[key] = future
+
+        # Outside the lock: the callback runs immediately if the job has already finished
+        future.add_done_callback(lambda done: self._finish_job(key, done))
+        return key
+
+    def _finish_job(self, key: str, future):
+        try:
+            self._store(key, future.result())
+        except Exception as e:
+            print(f"❌ PDF rendering failed: {e}")
+            with self._lock:
+                self._errors[key] = str(e)
+        with self._lock:
+            self._jobs.pop(key, None)
+
+    def job_status(self, key: str) -> str | None:
+        """'done', 'running' or 'failed'; None if the job is unknown (or its PDF was evicted)."""
+        with self._lock:
+            if key in self._pdfs: return 'done'
+            if key in self._jobs: return 'running'
+            if key in self._errors: return 'failed'
+            return None
+
+    def job_error(self, key: str) -> str | None:
+        with self._lock:
+            return self._errors.get(key)
+
+    def get_pdf(self, key: str) -> bytes | None:
+        """The rendered PDF for a job key, if it is ready."""
+        with self._lock:
+            pdf_bytes = self._pdfs.get(key)
+            if pdf_bytes is not None:
+                self._pdfs.move_to_end(key)
+            return pdf_bytes
+
+    def _store(self, key: str, pdf_bytes: bytes):
+        with self._lock:
+            if len(pdf_bytes) > self.max_cache_bytes:
+                # Too big to cache at all: record it, so pollers stop waiting instead of resubmitting
+                self._errors[key] = f"Report too large to cache ({len(pdf_bytes):,} bytes, limit {self.max_cache_bytes:,})."
+                return
+            if key in self._pdfs:
+                return  # Another session rendered it meanwhile
+            self._pdfs[key] = pdf_bytes
+            self._cache_bytes += len(pdf_bytes)
+            while self._cache_bytes > self.max_cache_bytes:
+                _, evicted = self._pdfs.popitem(last=False)
+                self._cache_bytes -= len(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._pdfs.clear()
+            self._errors.clear()
+            self._cache_bytes = 0
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+# One renderer per process, shared by all pages and sessions
+_renderer = ReportRenderer()
+
+def get_report_renderer() -> ReportRenderer:
+    return _renderer
+
+def pdf_download_button(report_html: str, file_name: str, label: str = "📄 Download as PDF", key: str | None = None, **button_kwargs):
+    """
+    PDF download for Streamlit pages that never blocks on rendering. Nothing is rendered until the
+    user clicks "Prepare PDF"; the report is then queued on the background renderer and a fragment
+    polls for it without rerunning the page. Once the PDF is ready the download button is shown.
+    """
+    import streamlit as st
+
+    renderer = get_report_renderer()
+    job_key = html_key(report_html)
+    widget_key = key or file_name
+    # The report this widget's user asked to render (a new report needs a new click)
+    requested_state_key = f"pdf_requested_{widget_key}"
+
+    def show_download_button():
+        st.download_button(
+            label=label,
+            data=renderer.get_pdf(job_key),
+            file_name=file_name,
+            mime="application/pdf",
+            key=key,
+            **button_kwargs
+        )
+
+    if renderer.job_status(job_key) == 'done':
+        show_download_button()
+        return
+
+    if st.session_state.get(requested_state_key) != job_key:
+        if not st.button("📄 Prepare PDF", key=f"prepare_{widget_key}", **button_kwargs):
+            return
+        st.session_state[requested_state_key] = job_key
+        renderer.submit(report_html)
+        st.rerun()  # Replace the button with the progress indicator
+
+    @st.fragment(run_every=POLL_INTERVAL_SECONDS)
+    def wait_for_pdf():
+        status = renderer.job_status(job_key)
+        if status == 'done':
+            st.rerun()  # Show the download button in a normal run, which stops the polling
+        elif status == 'failed':
+            st.error(f"Could not render the PDF: {renderer.job_error(job_key)}")
+            if st.button("Retry PDF", key=f"retry_{widget_key}", **button_kwargs):
+                renderer.submit(report_html, retry=True)
+        else:
+            if status is None:
+                renderer.submit(report_html)  # Requested, but evicted before this session downloaded it
+            st.button("⏳ Rendering PDF...", key=f"rendering_{widget_key}", disabled=True, **button_kwargs)
+
+    wait_for_pdf()
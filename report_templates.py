@@ -0,0 +1,164 @@
+# report_templates.py
+
+from asset_cache import inline_asset
+from club_registry import CLUB_REGISTRY
+
+# HTML generators for the printable reports, shared by the Streamlit pages and export_reports.py.
+# Each report's CSS is kept separate so batch exports can parse it once and reuse it
+# (pass inline_styles=False and hand the CSS to the renderer as a stylesheet).
+
+DEFAULT_CREST_URL = "https://i.imgur.com/8f2E3s3.png"
+
+CLUB_REPORT_CSS = """
+    body { font-family: sans-serif; color: #333; }
+    .report-container { border: 1px solid #ddd; padding: 20px; border-radius: 10px; max-width: 800px; margin: auto; }
+    .header { display: flex; align-items: center; border-bottom: 2px solid #eee; padding-bottom: 10px; margin-bottom: 10px; }
+    .header img { width: 60px; height: 60px; margin-right: 20px; }
+    .header h1 { margin: 0; font-size: 24px; }
+    .header p { margin: 0; color: #666; }
+    h2 { border-bottom: 1px solid #eee; padding-bottom: 5px; color: #00529B; }
+    ul { list-style-type: none; padding-left: 0; }
+    li { margin-bottom: 8px; font-size: 1.1em; }
+    b { color: #111; }
+"""
+
+PLAYER_REPORT_CSS = """
+    body { font-family: sans-serif; }
+    .report-container { border: 1px solid #ddd; padding: 20px; border-radius: 10px; }
+    .header { display: flex; align-items: center; border-bottom: 2px solid #eee; padding-bottom: 10px; }
+    .header img { width: 70px; margin-right: 20px; }
+    h1 { margin: 0; }
+    h2 { border-bottom: 1px solid #eee; padding-bottom: 5px; }
+"""
+
+TALENT_REPORT_CSS = """
+    body { font-family: sans-serif; color: #333; }
+    .report-container { border: 1px solid #ddd; padding: 20px; border-radius: 10px; max-width: 900px; margin: auto; }
+    .header { display: flex; align-items: center; border-bottom: 2px solid #eee; padding-bottom: 10px; margin-bottom: 10px; }
+    h1 { margin: 0; font-size: 24px; }
+    h2 { border-bottom: 1px solid #eee; padding-bottom: 5px; color: #00529B; }
+    table { width: 100%; border-collapse: collapse; }
+    th, td { padding: 8px; text-align: left; border-bottom: 1px solid #ddd; }
+    th { background-color: #f2f2f2; }
+"""
+
+def _style_block(css: str, inline_styles: bool) -> str:
+    return f"<style>{css}</style>" if inline_styles else ""
+
+def crest_url_for(club_name: str, crest_dict: dict) -> str:
+    """Crest of a club (by system name), or the placeholder crest if it has none, inlined when stored locally."""
+    return inline_asset(crest_dict.get(CLUB_REGISTRY.official_name(club_name), DEFAULT_CREST_URL))
+
+def top_skills(analysis_results: dict, n: int = 3) -> list:
+    """A player's n best KPIs as (kpi, percentile) pairs, from a get_player_analysis result."""
+    percentiles = {kpi: data['percentile'] for kpi, data in analysis_results['analysis'].items()}
+    return sorted(percentiles.items(), key=lambda item: item[1], reverse=True)[:n]
+
+def generate_club_report_html(club_data, crest_url, inline_styles: bool = True):
+    """Generates a clean HTML string for the club profile report."""
+
+    # Extract the tactical data from the club's profile
+    tactical_data = club_data.get('poc_metrics', {}).get('tactical_analysis', {})
+
+    # Prepare the key metrics for display in the report
+    stats_to_show = {
+        "Primary Formation": tactical_data.get('primary_formation', 'N/A'),
+        "Avg. Possession": f"{tactical_data.get('avg_possession_percentage', 0)}%",
+        "Pressing (PPDA)": f"{tactical_data.get('ppda', 0):.1f}",
+        "Avg. Pass Length": f"{tactical_data.get('avg_pass_length', 0):.1f}m"
+    }
+
+    stats_html = "".join([f"<li><b>{stat_name}:</b> {stat_value}</li>" for stat_name, stat_value in stats_to_show.items()])
+
+    report = f"""
+    <html>
+        <head>
+            {_style_block(CLUB_REPORT_CSS, inline_styles)}
+        </head>
+        <body>
+            <div class="report-container">
+                <div class="header">
+                    <img src="{crest_url}">
+                    <div>
+                        <h1>Club Tactical Profile</h1>
+                        <p><strong>{club_data['club_name']}</strong> | Season 2024-2025</p>
+                    </div>
+                </div>
+                <h2>Key Tactical Metrics</h2>
+                <ul>{stats_html}</ul>
+            </div>
+        </body>
+    </html>
+    """
+    return report
+
+def generate_report_html(player_name, age, pos, top_skills, match_data, crest_url, inline_styles: bool = True):
+    """Generates a clean HTML string for the printable report."""
+
+    skills_html = "".join([f"<li><b>{skill.replace('.', ' ').title()}:</b> Top {100-percentile:.0f}%</li>" for skill, percentile in top_skills])
+
+    drivers_html = "".join([f"<li>✅ {driver}</li>" for driver in match_data['reason'].split(' | ')])
+
+    report = f"""
+    <html>
+        <head>
+            {_style_block(PLAYER_REPORT_CSS, inline_styles)}
+        </head>
+        <body>
+            <div class="report-container">
+                <div class="header">
+                    <img src="{crest_url}">
+                    <div>
+                        <h1>Player-Club Fit Analysis</h1>
+                        <p><strong>Player:</strong> {player_name} | <strong>Position:</strong> {pos} | <strong>Age:</strong> {age}</p>
+                    </div>
+                </div>
+                <h2>Top Match: {match_data['club_name']} (Score: {match_data['match_score']:.1f})</h2>
+                <h3>Key Strengths</h3>
+                <ul>{skills_html}</ul>
+                <h3>Key Match Drivers</h3>
+                <ul>{drivers_html}</ul>
+            </div>
+        </body>
+    </html>
+    """
+    return report
+
+def generate_player_report_html(results_df, club_name, position, inline_styles: bool = True):
+    """Generates a clean HTML string for the player recommendations report."""
+
+    # Prepare the data for display
+    results_df['Key Strengths'] = results_df['Key Strengths'].apply(
+        lambda x: "<ul style='padding-left: 15px; margin: 0; text-align: left;'>" +
+                  "".join([f"<li>{s.strip()}</li>" for s in x.split('|')]) +
+                  "</ul>"
+    )
+    results_df['Match Score'] = results_df['Match Score'].map('{:.2f}'.format)
+    if "Rank" not in results_df.columns:
+        results_df.insert(0, "Rank", range(1, 1 + len(results_df)))
+
+    top_5_html = results_df.head(5).style.hide(axis="index").to_html(escape=False)
+    remaining_html = results_df.iloc[5:].style.hide(axis="index").to_html(escape=False)
+
+    report = f"""
+    <html>
+        <head>
+            {_style_block(TALENT_REPORT_CSS, inline_styles)}
+        </head>
+        <body>
+            <div class="report-container">
+                <div class="header">
+                    <h1>Talent Finder Report</h1>
+                </div>
+                <p><strong>Club Searched:</strong> {club_name} | <strong>Position of Need:</strong> {position}</p>
+
+                <h2>Top 5 Recommendations</h2>
+                {top_5_html}
+
+                <h2>Best of the Rest</h2>
+                {remaining_html}
+            </div>
+        </body>
+    </html>
+    """
+    return report
@@ -0,0 +1,89 @@
+# schema.py
+
+import pandas as pd
+
+# Compact in-memory representation shared by WyscoutDataLoader, PlayerAnalyzer and ClubProfileBuilder:
+# repeated names become categories, whole-number counts small ints and other measurements float32.
+
+# Team, position and status names repeat across thousands of rows
+CATEGORY_COLUMNS = {
+    'teams.name', 'team.name', 'positions.position.name', 'position_group',
+    'player_status', 'status', 'formation.primary', 'formation.secondary'
+}
+# Free text that stays as (non-categorical) strings
+TEXT_COLUMNS = {
+    'shortName', 'firstName', 'lastName', 'full_name', 'normalized_name', 'birthDate',
+    'player_name', 'club_name_transfermarkt', 'two_year_net_spend'
+}
+# Identifiers
+ID_COLUMNS = {'playerId', 'team.id', 'club_id'}
+# Values that keep full precision: money, and team stats that are shown rounded in profiles
+FLOAT64_COLUMNS = {'net_spend_eur', 'age', 'average.possessionPercent', 'average.passLength', 'total.ppda'}
+# Count-like stats, stored as small ints when every value is a whole number
+COUNT_PREFIXES = ('total.', 'Count ', 'positions.percent')
+
+# Identity and bookkeeping columns of the player stats export (KPI columns are added by the consumer)
+PLAYER_COLUMNS = [
+    'playerId', 'shortName', 'firstName', 'lastName', 'birthDate', 'teams.name',
+    'positions.position.name', 'positions.percent', 'total.minutesOnField', 'total.goals', 'total.assists'
+]
+
+def available_columns(csv_path: str, wanted: list) -> list:
+    """The wanted columns that exist in a CSV's header, in header order (for usecols)."""
+    wanted = set(wanted)
+    return [column for column in pd.read_csv(csv_path, nrows=0).columns if column in wanted]
+
+def declared_dtypes(columns) -> dict:
+    """read_csv dtypes for the columns the schema knows about; numeric columns are left to compact_frame."""
+    dtypes = {}
+    for column in columns:
+        if column in CATEGORY_COLUMNS:
+            dtypes[column] = 'category'
+        elif column in TEXT_COLUMNS:
+            dtypes[column] = str
+        elif column in ID_COLUMNS:
+            dtypes[column] = 'Int32'
+        elif column in FLOAT64_COLUMNS:
+            dtypes[column] = 'float64'
+    return dtypes
+
+# read_csv dtypes for every column the schema knows (read_csv ignores the ones a file doesn't have).
+# Built in sorted order so the dict, and the read_csv_cached key derived from it, is the same in every process.
+SCHEMA_DTYPES = declared_dtypes(sorted(CATEGORY_COLUMNS | TEXT_COLUMNS | ID_COLUMNS | FLOAT64_COLUMNS))
+
+def compact_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Downcasts a frame in place to the compact schema and returns it: names listed in
+    CATEGORY_COLUMNS become categories, complete whole-number counts the smallest integer
+    type that fits, and every other float column float32.
+    """
+    for column in df.columns:
+        values = df[column]
+        if column in CATEGORY_COLUMNS:
+            if not isinstance(values.dtype, pd.CategoricalDtype):
+                df[column] = values.astype('category')
+        elif column in ID_COLUMNS or column in FLOAT64_COLUMNS or not pd.api.types.is_numeric_dtype(values) or pd.api.types.is_bool_dtype(values):
+            continue
+        elif str(column).startswith(COUNT_PREFIXES) and values.notna().all() and (values % 1 == 0).all():
+            df[column] = pd.to_numeric(values, downcast='integer')
+        elif pd.api.types.is_float_dtype(values):
+            df[column] = values.astype('float32')
+    return df
+
+def reference_date(date=None) -> pd.Timestamp:
+    """The day ages are measured against: the given date, or today (without the time of day)."""
+    return pd.Timestamp.today().normalize() if date is None else pd.Timestamp(date).normalize()
+
+def add_ages(df: pd.DataFrame, as_of: pd.Timestamp) -> pd.DataFrame:
+    """
+    Parses birthDate into datetime64 (unparseable dates become NaT) and adds 'age' in
+    years as of the as_of date, in place, so consumers read ages instead of re-parsing dates.
+    """
+    df['birthDate'] = pd.to_datetime(df['birthDate'], errors='coerce')
+    df['age'] = (as_of - df['birthDate']).dt.days / 365.25
+    return df
+
+def age_on(birth_date, as_of: pd.Timestamp):
+    """Whole years from a birth date (Timestamp or ISO string) to as_of, counted as add_ages does; 'N/A' if unknown."""
+    birth_date = pd.to_datetime(birth_date, errors='coerce')
+    return int((as_of - birth_date).days / 365.25) if pd.notna(birth_date) else "N/A"
@@ -2,21 +2,104 @@
 import requests
 from bs4 import BeautifulSoup
 import pandas as pd
+import hashlib
+import json
 import os
+import re
 
-def scrape_club_crests(url: str, output_path: str):
+try:
+    from PIL import Image
+except ImportError:  # Pillow is optional: without it the original image doubles as the thumbnail
+    Image = None
+
+# --- Local asset store (read by asset_cache.py) ---
+ASSETS_DIR = "./data/assets"
+ASSET_MANIFEST = os.path.join(ASSETS_DIR, "manifest.json")
+THUMBNAIL_SIZE = (128, 128)  # Crests and icons are shown at 40-70px
+
+# Icons and the placeholder crest used by the app pages, stored alongside the crests
+ICON_URLS = [
+    "https://i.imgur.com/8f2E3s3.png",
+    "https://cdn-icons-png.flaticon.com/512/2173/2173508.png",
+    "https://cdn-icons-png.flaticon.com/512/2718/2718459.png",
+    "https://cdn-icons-png.flaticon.com/512/8831/8831516.png",
+    "https://cdn-icons-png.flaticon.com/512/10062/10062255.png",
+    "https://cdn-icons-png.flaticon.com/512/1106/1106944.png",
+    "https://cdn-icons-png.flaticon.com/512/3333/3333673.png",
+]
+
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+
+def _asset_file_name(url: str) -> str:
+    """A stable, unique local file name for an asset URL, e.g. '3f2a9c1d0e_fcsb.png'."""
+    base_name = re.sub(r'[^0-9A-Za-z._-]+', '_', os.path.basename(url.split('?')[0])) or 'asset'
+    return f"{hashlib.sha1(url.encode('utf-8')).hexdigest()[:10]}_{base_name}"
+
+def _make_thumbnail(file_path: str) -> str | None:
+    """Saves a PNG thumbnail next to a raster image; returns its file name, or None if it can't be made."""
+    if Image is None or file_path.lower().endswith('.svg'):
+        return None
+    thumbnail_path = os.path.splitext(file_path)[0] + '_thumb.png'
+    try:
+        with Image.open(file_path) as image:
+            image.thumbnail(THUMBNAIL_SIZE)
+            image.save(thumbnail_path, format='PNG', optimize=True)
+    except OSError as e:
+        print(f"[WARN] Could not create a thumbnail for {file_path}: {e}")
+        return None
+    return os.path.basename(thumbnail_path)
+
+def download_assets(urls: list, assets_dir: str = ASSETS_DIR, manifest_path: str = ASSET_MANIFEST) -> dict:
     """
-    Scrapes the Superliga website to get the name and crest URL for each club,
-    with detailed logging for verification.
+    Downloads images into the local asset store with resized thumbnails and records them in the
+    manifest. Assets that are already stored are skipped.
     """
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-    }
+    manifest = {}
+    if os.path.exists(manifest_path):
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+
+    os.makedirs(assets_dir, exist_ok=True)
+    session = requests.Session()
+    session.headers.update(HEADERS)
+
+    for url in dict.fromkeys(urls):
+        entry = manifest.get(url)
+        if entry and os.path.exists(os.path.join(assets_dir, entry['file'])):
+            continue
+        try:
+            response = session.get(url, timeout=20)
+            response.raise_for_status()
+        except requests.exceptions.RequestException as e:
+            print(f"❌ Could not download {url}: {e}")
+            continue
+
+        file_name = _asset_file_name(url)
+        file_path = os.path.join(assets_dir, file_name)
+        with open(file_path, 'wb') as f:
+            f.write(response.content)
+        manifest[url] = {"file": file_name, "thumbnail": _make_thumbnail(file_path) or file_name}
+        print(f"[LOG] Stored {url} as {file_name}")
+
+    temp_path = manifest_path + '.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(temp_path, manifest_path)
+    print(f"✅ {len(manifest)} assets available locally in: {assets_dir}")
+    return manifest
 
+def scrape_club_crests(url: str, output_path: str, download_images: bool = True):
+    """
+    Scrapes the Superliga website to get the name and crest URL for each club,
+    with detailed logging for verification. The crest images (and the app's icons) are
+    then stored locally so pages and reports don't have to fetch them.
+    """
     print(f"--- Scraping club crests from: {url} ---")
 
     try:
-        response = requests.get(url, headers=headers)
+        response = requests.get(url, headers=HEADERS)
         response.raise_for_status()
         soup = BeautifulSoup(response.content, 'html.parser')
 
@@ -57,6 +140,9 @@ def scrape_club_crests(url: str, output_path: str):
         df.to_csv(output_path, index=False)
         print(f"\n✅ Club crest data saved successfully to: {output_path}")
 
+        if download_images:
+            download_assets(list(df.get('crest_url', [])) + ICON_URLS)
+
         return df
 
     except requests.exceptions.RequestException as e:
@@ -67,4 +153,4 @@ if __name__ == "__main__":
     scrape_club_crests(
         url="https://www.superliga.ro/",
         output_path="./data/processed/club_crests.csv"
-    )
\ No newline at end of file
+    )
@@ -3,22 +3,7 @@ import requests
 from bs4 import BeautifulSoup
 import pandas as pd
 import os
-
-TEAM_URL_MAPPING = {
-    "Dinamo Bucuresti": {"name": "fc-dinamo-1948", "id": "312"},
-    "FCS Bucuresti": {"name": "fcsb", "id": "301"},
-    "Rapid Bucuresti": {"name": "fc-rapid-1923", "id": "455"},
-    "Otelul": {"name": "sc-otelul-galati", "id": "4959"},
-    "CFR Cluj": {"name": "cfr-cluj", "id": "7769"},
-    "Botosani": {"name": "fc-botosani", "id": "8818"},
-    "Unirea Slobozia": {"name": "afc-unirea-04-slobozia", "id": "29700"},
-    "Universitatea Craiova": {"name": "cs-universitatea-craiova", "id": "40812"},
-    "UTA Arad": {"name": "uta-arad", "id": "952"},
-    "Hermannstadt": {"name": "fc-hermannstadt", "id": "58049"},
-    "Universitatea Cluj": {"name": "fc-universitatea-cluj", "id": "6429"},
-    "Petrolul 52": {"name": "petrolul-ploiesti", "id": "9465"},
-    "Farul Constanta": {"name": "fcv-farul-constanta", "id": "29831"}
-}
+from club_registry import CLUB_REGISTRY
 
 def scrape_fixtures(formations_path: str, output_path: str, season_id="2024"):
     headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'}
@@ -26,19 +11,17 @@ def scrape_fixtures(formations_path: str, output_path: str, season_id="2024"):
     
     try:
         formations_df = pd.read_csv(formations_path)
-        primary_formations = pd.Series(
-            formations_df['formation.primary'].values,
-            index=formations_df['team.name']
-        ).to_dict()
+        # Keyed by club id, so any spelling of a club's name in the formations file matches
+        primary_formations = dict(zip(CLUB_REGISTRY.resolve(formations_df['team.name']), formations_df['formation.primary']))
     except FileNotFoundError:
         print(f"❌ ERROR: Formations file not found at {formations_path}")
         return
 
     all_fixtures = []
 
-    for club_name, url_data in TEAM_URL_MAPPING.items():
-        primary_formation_from_file = str(primary_formations.get(club_name))
-        if not primary_formation_from_file:
+    for club_name, url_data in CLUB_REGISTRY.transfermarkt_pages().items():
+        primary_formation_from_file = primary_formations.get(CLUB_REGISTRY.club_id(club_name))
+        if not isinstance(primary_formation_from_file, str):
             continue
 
         url = base_url.format(name=url_data['name'], id=url_data['id'], season=season_id)
@@ -104,6 +87,7 @@ def scrape_fixtures(formations_path: str, output_path: str, season_id="2024"):
     else:
         print("\n❌ No relevant fixtures were found.")
 
+# Run from the repository root: python -m scrapers.fixture_scraper
 if __name__ == "__main__":
     scrape_fixtures(
         formations_path="./data/raw/superliga_formations_24_25.csv",
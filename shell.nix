@@ -24,6 +24,7 @@ pkgs.mkShell {
     (pkgs.python311.withPackages (ps: [
       ps.pandas
       ps.numpy
+      ps.pyarrow
       ps.requests
       ps.beautifulsoup4
       ps.tqdm
@@ -31,6 +32,7 @@ pkgs.mkShell {
       ps.matplotlib
       ps.selenium
       ps.weasyprint
+      ps.pypdf
     ]))
   ];
 
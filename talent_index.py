@@ -0,0 +1,97 @@
+# talent_index.py
+
+import hashlib
+import json
+import os
+import time
+from data_cache import temp_path_for
+from match_finder import MatchFinder
+from player_analyzer import POSITION_KPIS
+from schema import age_on, reference_date
+
+# Stored next to club_profiles_final.json
+TALENT_INDEX_FILE = './data/processed/talent_index.json'
+# Bump when the structure of the stored rankings changes
+TALENT_INDEX_FORMAT = 2
+
+def index_version(finder: MatchFinder) -> str:
+    """Identifies the inputs of a talent index: the finder's profiles and player data, plus the index format."""
+    return hashlib.sha1(f"format={TALENT_INDEX_FORMAT}:{finder.data_version}".encode('utf-8')).hexdigest()
+
+class TalentIndex:
+    def __init__(self, version: str, rankings: dict, as_of=None):
+        """
+        Every (club, position group) talent-finder ranking, precomputed, so the Club Needs
+        Finder serves clicks from memory. rankings: club -> position group -> ranked rows,
+        as returned by MatchFinder.find_best_players_for_club with birth_dates=True.
+        Rows store birth dates, so the index stays valid across days; ages are derived as of
+        as_of (default: today) when rows are served.
+        """
+        self.version = version
+        self.rankings = rankings
+        self.as_of = reference_date(as_of)
+
+    @classmethod
+    def build(cls, finder: MatchFinder) -> 'TalentIndex':
+        """Ranks every player for every club and position group."""
+        start = time.perf_counter()
+        rankings = {
+            club_name: {
+                position_group: finder.find_best_players_for_club(club_name, position_group, birth_dates=True)
+                for position_group in POSITION_KPIS
+            }
+            for club_name in finder.club_profiles
+        }
+        print(f"✅ Talent index built for {len(rankings)} clubs in {time.perf_counter() - start:.2f}s.")
+        return cls(index_version(finder), rankings, as_of=finder.player_analyzer.reference_date)
+
+    def save(self, path: str = TALENT_INDEX_FILE):
+        # Workers that find a stale index rebuild it at the same time; each writes its own temp file
+        temp_path = temp_path_for(path)
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump({"version": self.version, "rankings": self.rankings}, f, ensure_ascii=False)
+            os.replace(temp_path, path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        print(f"Talent index saved to: {path}")
+
+    @classmethod
+    def load(cls, path: str, expected_version: str, as_of=None) -> 'TalentIndex | None':
+        """The stored index, or None if there is none, it can't be read or it was built from different data."""
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                stored = json.load(f)
+            version, rankings = stored["version"], stored["rankings"]
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"[WARN] Could not read the stored talent index ({e}); rebuilding it.")
+            return None
+        if version != expected_version:
+            print("[INFO] Stored talent index is out of date.")
+            return None
+        return cls(version, rankings, as_of=as_of)
+
+    @classmethod
+    def load_or_build(cls, finder: MatchFinder, path: str = TALENT_INDEX_FILE) -> 'TalentIndex':
+        """Loads the stored index if it matches the finder's data, otherwise rebuilds and stores it."""
+        index = cls.load(path, index_version(finder), as_of=finder.player_analyzer.reference_date)
+        if index is None:
+            index = cls.build(finder)
+            index.save(path)
+        return index
+
+    def get(self, club_name: str, position_group: str, top_k: int | None = None, offset: int = 0) -> list:
+        """Ranked players offset .. offset + top_k for a club and position group (same contract as find_best_players_for_club)."""
+        ranking = self.rankings.get(club_name, {}).get(position_group, [])
+        page_end = len(ranking) if top_k is None else offset + top_k
+        return [self._served_row(row) for row in ranking[offset:page_end]]
+
+    def _served_row(self, row: dict) -> dict:
+        """A copy of a stored row with its birth date replaced by the player's age, in the same column position."""
+        return {
+            ("Age" if field == "Birth Date" else field): (age_on(value, self.as_of) if field == "Birth Date" else value)
+            for field, value in row.items()
+        }
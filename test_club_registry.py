@@ -0,0 +1,66 @@
+# test_club_registry.py
+import pandas as pd
+import pytest
+from club_registry import CLUBS, ClubRegistry
+
+def test_resolve_aliases():
+    """Every spelling of a club resolves to the same id; missing and unknown names resolve to NA."""
+    registry = ClubRegistry()
+    names = pd.Series(['FCSB', 'FCS Bucuresti', 'fcsb ', 'Fcsb', 'CFR Cluj', 'FC Hermannstadt', 'AFC Hermannstadt', None, float('nan'), 'Nowhere FC'])
+    club_ids = registry.resolve(names)
+
+    assert str(club_ids.dtype) == 'Int32'
+    assert club_ids.index.equals(names.index)
+    assert club_ids.iloc[:4].nunique() == 1
+    assert club_ids.iloc[5] == club_ids.iloc[6] == registry.club_id('Hermannstadt')
+    assert club_ids.iloc[7:].isna().all()
+
+    assert registry.canonical_name('FCSB') == 'FCS Bucuresti'
+    assert registry.canonical_name('Oțelul Galați') == 'Otelul'
+    assert registry.official_name('FCS Bucuresti') == 'Fcsb'
+    assert registry.official_name('Poli Iasi') is None
+    assert set(registry.transfermarkt_pages()) == {name for name, club in CLUBS.items() if club['transfermarkt']}
+    print("✅ Club aliases resolve to one id.")
+
+def test_unknown_clubs_are_registered_explicitly():
+    """Lookups never add clubs; register and resolve(register_unknown=True) do, once per club."""
+    registry = ClubRegistry()
+    club_count = len(registry.names)
+    assert registry.club_id('Nowhere FC') is None
+    assert registry.canonical_name('Nowhere FC') is None
+    assert len(registry.names) == club_count
+
+    club_ids = registry.resolve(pd.Series(['Nowhere FC', 'NOWHERE fc', 'FCSB', None]), register_unknown=True)
+    assert len(registry.names) == club_count + 1
+    assert club_ids.iloc[0] == club_ids.iloc[1] == club_count
+    assert pd.isna(club_ids.iloc[3])
+    assert registry.register('Nowhere FC') == club_count
+    assert registry.register(None) is None
+    assert registry.canonical_name('nowhere  fc') == 'Nowhere FC'
+    print("✅ Unknown clubs are only added on request.")
+
+def test_join_on_club_id():
+    """Tables that spell clubs differently join on club_id."""
+    registry = ClubRegistry()
+    teams_df = pd.DataFrame({'team.name': ['FCS Bucuresti', 'Otelul', 'Promoted FC'], 'points': [70, 40, 30]})
+    balance_df = pd.DataFrame({'club_name_transfermarkt': ['FCSB', 'SC Otelul Galati', 'Unknown Club'], 'net_spend_eur': [1.0, -2.0, 3.0]})
+    teams_df['club_id'] = registry.resolve(teams_df['team.name'], register_unknown=True)
+    balance_df['club_id'] = registry.resolve(balance_df['club_name_transfermarkt'])
+
+    joined = teams_df.merge(balance_df, on='club_id', how='left')
+    assert joined['net_spend_eur'].tolist()[:2] == [1.0, -2.0]
+    assert pd.isna(joined['net_spend_eur'].iloc[2])
+    assert registry.names[joined['club_id'].iloc[2]] == 'Promoted FC'
+    print("✅ Differently spelled tables join on club_id.")
+
+def test_conflicting_aliases_are_rejected():
+    clubs = {"Club A": {"aliases": ["Shared Name"]}, "Club B": {"aliases": ["shared name"]}}
+    with pytest.raises(ValueError):
+        ClubRegistry(clubs)
+    print("✅ An alias can only belong to one club.")
+
+if __name__ == "__main__":
+    test_resolve_aliases()
+    test_unknown_clubs_are_registered_explicitly()
+    test_join_on_club_id()
+    test_conflicting_aliases_are_rejected()
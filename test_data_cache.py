@@ -0,0 +1,85 @@
+# test_data_cache.py
+import os
+import tempfile
+import time
+import pandas as pd
+import pytest
+from data_cache import _cache_paths, read_csv_cached, source_version, write_json_atomic
+
+pytest.importorskip('pyarrow')
+
+def write_csv(path: str, rows: list):
+    pd.DataFrame(rows, columns=['name', 'value']).to_csv(path, index=False)
+
+def cache_inode(csv_path: str, cache_dir: str, **read_csv_kwargs) -> int:
+    """The inode of a cached copy; it changes whenever the copy is rewritten (os.replace)."""
+    return os.stat(_cache_paths(csv_path, cache_dir, read_csv_kwargs)[0]).st_ino
+
+def test_feather_cache_invalidation(tmp_path):
+    """The cached copy is reused until the CSV's contents change, and rebuilt when its metadata is unreadable."""
+    csv_path, cache_dir = os.path.join(str(tmp_path), 'players.csv'), os.path.join(str(tmp_path), 'cache')
+    write_csv(csv_path, [['A', 1], ['B', 2]])
+
+    first = read_csv_cached(csv_path, cache_dir=cache_dir)
+    built = cache_inode(csv_path, cache_dir)
+    pd.testing.assert_frame_equal(read_csv_cached(csv_path, cache_dir=cache_dir), first)
+    assert cache_inode(csv_path, cache_dir) == built
+
+    # Touched but unchanged: the copy is kept
+    stat = os.stat(csv_path)
+    os.utime(csv_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    read_csv_cached(csv_path, cache_dir=cache_dir)
+    assert cache_inode(csv_path, cache_dir) == built
+
+    # Same size, new contents: the copy is rebuilt
+    write_csv(csv_path, [['A', 1], ['B', 3]])
+    changed = read_csv_cached(csv_path, cache_dir=cache_dir)
+    assert changed['value'].tolist() == [1, 3]
+    rebuilt = cache_inode(csv_path, cache_dir)
+    assert rebuilt != built
+
+    # Corrupt metadata: the copy is rebuilt from the CSV
+    with open(_cache_paths(csv_path, cache_dir, {})[1], 'w', encoding='utf-8') as f:
+        f.write('{"sha1": ')
+    pd.testing.assert_frame_equal(read_csv_cached(csv_path, cache_dir=cache_dir), changed)
+    assert cache_inode(csv_path, cache_dir) != rebuilt
+
+    # Other read_csv options get their own copy
+    subset = read_csv_cached(csv_path, cache_dir=cache_dir, usecols=['value'])
+    assert subset.columns.tolist() == ['value']
+    assert _cache_paths(csv_path, cache_dir, {'usecols': ['value']}) != _cache_paths(csv_path, cache_dir, {})
+    print("✅ Feather cache is reused and rebuilt when expected.")
+
+def test_source_version(tmp_path):
+    """source_version reuses the hash of a cached load and changes with the file."""
+    csv_path, cache_dir = os.path.join(str(tmp_path), 'players.csv'), os.path.join(str(tmp_path), 'cache')
+    write_csv(csv_path, [['A', 1]])
+    read_csv_cached(csv_path, cache_dir=cache_dir)
+    loaded_version = source_version(csv_path)
+    assert ':' not in loaded_version
+
+    time.sleep(0.01)
+    write_csv(csv_path, [['A', 2]])
+    assert source_version(csv_path) != loaded_version
+    print("✅ Source versions follow the file.")
+
+def test_atomic_writes_leave_no_temp_files(tmp_path):
+    """write_json_atomic replaces the target with the usual permissions and leaves no temp file behind."""
+    target = os.path.join(str(tmp_path), 'meta.json')
+    write_json_atomic(target, {"a": 1})
+    write_json_atomic(target, {"a": 2})
+    assert os.listdir(str(tmp_path)) == ['meta.json']
+
+    umask = os.umask(0)
+    os.umask(umask)
+    assert os.stat(target).st_mode & 0o777 == 0o666 & ~umask
+
+    with pytest.raises(TypeError):
+        write_json_atomic(target, {"a": object()})
+    assert os.listdir(str(tmp_path)) == ['meta.json']
+    print("✅ Atomic writes clean up after themselves.")
+
+if __name__ == "__main__":
+    for test in [test_feather_cache_invalidation, test_source_version, test_atomic_writes_leave_no_temp_files]:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            test(tmp_dir)
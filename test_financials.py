@@ -0,0 +1,34 @@
+# test_financials.py
+from financials import format_eur_millions, get_net_spend_eur, parse_eur_amount
+
+def test_parse_eur_amount():
+    """Transfermarkt amount strings and plain numbers parse to euros; anything else gives None."""
+    assert parse_eur_amount('€1.23m') == 1.23 * 1_000_000
+    assert parse_eur_amount('€-500k') == -500_000
+    assert parse_eur_amount('+€1.2bn') == 1.2 * 1_000_000_000
+    assert parse_eur_amount('€850th.') == 850_000
+    assert parse_eur_amount(' €2.5M ') == 2_500_000
+    assert parse_eur_amount('€0') == 0
+    assert parse_eur_amount(3_000_000) == 3_000_000.0
+    assert parse_eur_amount(-12.5) == -12.5
+
+    for unparsable in [None, float('nan'), '', '-', '?', 'n/a', '€m']:
+        assert parse_eur_amount(unparsable) is None
+    print("✅ EUR amounts parse as expected.")
+
+def test_net_spend_and_formatting():
+    """The numeric net spend wins over the formatted string, which older profiles fall back to."""
+    assert get_net_spend_eur({"net_spend_eur": 1_500_000, "two_year_net_spend": "€9.99m"}) == 1_500_000
+    assert get_net_spend_eur({"two_year_net_spend": "€-0.75m"}) == -750_000
+    assert get_net_spend_eur({"net_spend_eur": None}) is None
+    assert get_net_spend_eur({}) is None
+
+    assert format_eur_millions(1_230_000) == "€1.23m"
+    assert format_eur_millions(-750_000) == "€-0.75m"
+    assert format_eur_millions(None) == "Data Not Available"
+    assert format_eur_millions(float('nan')) == "Data Not Available"
+    print("✅ Net spend reads and formats as expected.")
+
+if __name__ == "__main__":
+    test_parse_eur_amount()
+    test_net_spend_and_formatting()
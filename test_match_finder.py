@@ -1,6 +1,7 @@
 # test_match_finder.py
 from player_analyzer import PlayerAnalyzer, PLAYERS_STATS_FILE, PLAYERS_PHYSICAL_FILE
 from match_finder import MatchFinder
+from financials import get_net_spend_eur, format_eur_millions
 import pandas as pd
 
 def print_head_to_head_comparison(match_finder, player_pos, club1_name, club2_name):
@@ -27,8 +28,8 @@ def print_head_to_head_comparison(match_finder, player_pos, club1_name, club2_na
 
     c1_pos_data = club1_data['poc_metrics']['current_squad_analysis'].get(player_pos, {})
     c2_pos_data = club2_data['poc_metrics']['current_squad_analysis'].get(player_pos, {})
-    c1_finance = club1_data['poc_metrics']['financial_analysis']['two_year_net_spend']
-    c2_finance = club2_data['poc_metrics']['financial_analysis']['two_year_net_spend']
+    c1_finance = format_eur_millions(get_net_spend_eur(club1_data['poc_metrics']['financial_analysis']))
+    c2_finance = format_eur_millions(get_net_spend_eur(club2_data['poc_metrics']['financial_analysis']))
     c1_formation = club1_data['poc_metrics']['tactical_analysis']['primary_formation']
     c2_formation = club2_data['poc_metrics']['tactical_analysis']['primary_formation']
 
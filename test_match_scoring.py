@@ -0,0 +1,208 @@
+# test_match_scoring.py
+import json
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+import match_finder
+from financials import get_net_spend_eur
+from match_finder import FORMATION_FIT_MATRIX, MatchFinder, top_k_order
+from player_analyzer import PlayerAnalyzer, POSITION_KPIS
+
+TEST_AS_OF = '2025-06-30'
+TEST_POSITIONS = ['Centre Back', 'Left Back', 'Right Wing-Back', 'Central Midfielder', 'Attacking Midfielder', 'Striker', 'Right Winger']
+
+def write_test_data(data_dir: str, player_count: int = 60, seed: int = 7) -> tuple:
+    """
+    Writes a small synthetic league into data_dir: player stats and physical CSVs plus club profiles.
+    Scores are drawn on a coarse grid so ties and .x5 rounding boundaries are common.
+    Returns (stats_path, physical_path, profiles_path).
+    """
+    rng = np.random.default_rng(seed)
+    short_names = [f"F. Last{i}" for i in range(player_count)]
+    stats_df = pd.DataFrame({
+        'playerId': range(1000, 1000 + player_count),
+        'shortName': short_names,
+        'firstName': [f"Fírst{i}" for i in range(player_count)],
+        'lastName': [f"Last{i}" for i in range(player_count)],
+        'birthDate': [f"{1990 + i % 12}-{1 + i % 12:02d}-{1 + i % 28:02d}" if i % 10 else '' for i in range(player_count)],
+        'teams.name': rng.choice(['FCSB', 'CFR Cluj', 'Otelul Galati', ''], player_count),
+        'positions.position.name': rng.choice(TEST_POSITIONS, player_count),
+        'positions.percent': rng.integers(40, 100, player_count),
+        'total.minutesOnField': rng.integers(100, 3000, player_count),
+        'total.goals': rng.integers(0, 8, player_count),
+        'total.assists': rng.integers(0, 8, player_count),
+        'percent.defensiveDuelsWon': rng.integers(40, 80, player_count),
+        'total.interceptions': rng.integers(0, 50, player_count),
+        'percent.aerialDuelsWon': rng.integers(30, 70, player_count),
+        'percent.successfulPasses': rng.integers(60, 95, player_count),
+        'total.passesToFinalThird': rng.integers(0, 90, player_count),
+        'total.duelsWon': rng.integers(10, 200, player_count),
+        'percent.goalConversion': rng.integers(0, 30, player_count),
+        'total.xgShot': rng.integers(0, 12, player_count) / 2,
+    })
+    physical_df = pd.DataFrame({
+        'player_name': short_names,
+        'Max Speed': rng.integers(28, 35, player_count),
+        'Count High Acceleration': rng.integers(10, 60, player_count),
+        'Total Distance': rng.integers(8000, 12000, player_count),
+        'High Intensity (HI) Distance': rng.integers(300, 900, player_count),
+        'Count Sprint': rng.integers(5, 40, player_count),
+    })
+
+    formations = ['4-3-3', '3-5-2', '4-2-3-1', None, '5-4-1', '4-4-2']
+    net_spends = [{"net_spend_eur": 1_500_000}, {"net_spend_eur": -250_000}, {"two_year_net_spend": "€3.20m"},
+                  {"net_spend_eur": None}, {"two_year_net_spend": "€0"}, {"net_spend_eur": 900_000}]
+    profiles = []
+    for club_number, (formation, financial_analysis) in enumerate(zip(formations, net_spends)):
+        # Every other club misses a position, so some pairs can't be scored
+        positions = TEST_POSITIONS[club_number % 2:]
+        profiles.append({
+            "club_name": f"Club {club_number}",
+            "poc_metrics": {
+                "deal_attractiveness_index": {pos: float(rng.integers(0, 200)) / 2 + 0.05 * (club_number % 3) for pos in positions},
+                "tactical_analysis": {"primary_formation": formation},
+                "financial_analysis": financial_analysis,
+                "current_squad_analysis": {pos: {"depth": int(rng.integers(1, 8)), "avg_age": float(rng.integers(40, 64)) / 2} for pos in positions}
+            }
+        })
+    # A promoted club without data
+    profiles.append({"club_name": "Promoted Club", "poc_metrics": {}})
+
+    stats_path = os.path.join(data_dir, 'players.csv')
+    physical_path = os.path.join(data_dir, 'physical.csv')
+    profiles_path = os.path.join(data_dir, 'club_profiles.json')
+    stats_df.to_csv(stats_path, index=False)
+    physical_df.to_csv(physical_path, index=False)
+    with open(profiles_path, 'w', encoding='utf-8') as f:
+        json.dump(profiles, f)
+    return stats_path, physical_path, profiles_path
+
+def build_test_finder(data_dir: str) -> MatchFinder:
+    stats_path, physical_path, profiles_path = write_test_data(data_dir)
+    analyzer = PlayerAnalyzer(stats_path=stats_path, physical_path=physical_path, as_of=TEST_AS_OF)
+    return MatchFinder(profiles_path, analyzer)
+
+# --- Reference implementation: the per-pair scoring MatchScoringEngine replaced ---
+def scalar_tactical_fit(player_position: str, club_formation) -> int:
+    if not club_formation or not isinstance(club_formation, str):
+        return 50
+    best_match_key = next((key for key in FORMATION_FIT_MATRIX if key in player_position), None)
+    return FORMATION_FIT_MATRIX[best_match_key].get(club_formation, 70) if best_match_key else 70
+
+def scalar_match_score(player_pos: str, club_profile: dict, league_averages: dict) -> dict | None:
+    poc_metrics = club_profile.get('poc_metrics', {})
+    if not poc_metrics or player_pos not in poc_metrics.get('deal_attractiveness_index', {}):
+        return None
+    deal_score = poc_metrics['deal_attractiveness_index'][player_pos]
+    tactical_score = scalar_tactical_fit(player_pos, poc_metrics.get('tactical_analysis', {}).get('primary_formation'))
+    final_score = (deal_score * 0.70) + (tactical_score * 0.30)
+
+    reasons = []
+    squad_pos_data = poc_metrics.get('current_squad_analysis', {}).get(player_pos, {})
+    if squad_pos_data.get('depth', 5) <= league_averages['depth'].get(player_pos, 5) * 0.75:
+        reasons.append("Low Depth")
+    if squad_pos_data.get('avg_age', 25) >= league_averages['age'].get(player_pos, 26) * 1.1:
+        reasons.append("Aging Squad")
+    net_spend = get_net_spend_eur(poc_metrics.get('financial_analysis', {}))
+    if net_spend is not None and net_spend > 0 and net_spend >= league_averages['net_spend']:
+        reasons.append("Has Funds")
+    if tactical_score >= 80:
+        reasons.append("Ideal Formation")
+    elif tactical_score >= 60:
+        reasons.append("Good Formation")
+
+    return {
+        "club_name": club_profile['club_name'],
+        "match_score": round(final_score, 1),
+        "reason": " | ".join(reasons) if reasons else "Balanced Need",
+        "deal_score": deal_score,
+        "tactical_score": tactical_score
+    }
+
+def test_vectorized_scores_match_scalar_scoring(tmp_path):
+    """find_best_matches gives the same scores, reasons and order as scoring each club one by one."""
+    _, _, profiles_path = write_test_data(str(tmp_path))
+    finder = MatchFinder(profiles_path, None)
+
+    for position in TEST_POSITIONS + ['Goalkeeper']:
+        expected = [
+            match for match in (scalar_match_score(position, club, finder.league_averages) for club in finder.club_profiles.values())
+            if match
+        ]
+        expected.sort(key=lambda match: match['match_score'], reverse=True)
+        matches = finder.find_best_matches({"full_name": f"Test {position}", "position_name": position})
+        assert [{key: match[key] for key in expected_match} for match, expected_match in zip(matches, expected)] == expected
+        assert len(matches) == len(expected)
+
+        for club in finder.club_profiles.values():
+            single = finder._calculate_match_score({"position_name": position}, club)
+            reference = scalar_match_score(position, club, finder.league_averages)
+            assert (single is None) == (reference is None)
+            if single:
+                assert single == reference
+    print("✅ Vectorized match scores equal the per-pair scores.")
+
+def test_top_k_order_matches_stable_sort():
+    """top_k_order picks the same indices, in the same order, as a stable descending sort."""
+    rng = np.random.default_rng(3)
+    for size in [0, 1, 5, 50]:
+        # Few distinct values, so many scores tie
+        scores = rng.integers(0, 6, size).astype(float)
+        full_order = np.argsort(-scores, kind='stable')
+        for k in [0, 1, 3, size, size + 2]:
+            assert top_k_order(scores, k).tolist() == full_order[:k].tolist()
+    print("✅ Top-k selection matches a full stable sort.")
+
+def test_player_ranking_pages(tmp_path):
+    """Pages of find_best_players_for_club add up to the full ranking, which is sorted by score."""
+    finder = build_test_finder(str(tmp_path))
+
+    for club_name in finder.club_profiles:
+        for position_group in POSITION_KPIS:
+            full_ranking = finder.find_best_players_for_club(club_name, position_group)
+            scores = [player["Match Score"] for player in full_ranking]
+            assert scores == sorted(scores, reverse=True)
+
+            pages = []
+            for offset in range(0, len(full_ranking) + 3, 3):
+                pages += finder.find_best_players_for_club(club_name, position_group, top_k=3, offset=offset)
+            assert pages == full_ranking
+            assert finder.find_best_players_for_club(club_name, position_group, top_k=0) == []
+
+    assert finder.find_best_players_for_club("Unknown Club", "Forward") == []
+    assert finder.find_best_players_for_club("Club 0", "Goalkeeper") == []
+    print("✅ Ranking pages add up to the full ranking.")
+
+def test_match_memo(tmp_path):
+    """find_best_matches is memoized per player, returns copies and evicts the least recently used player."""
+    _, _, profiles_path = write_test_data(str(tmp_path))
+    finder = MatchFinder(profiles_path, None)
+    striker = {"full_name": "Test Striker", "position_name": "Striker"}
+    winger = {"full_name": "Test Winger", "position_name": "Right Winger"}
+
+    first = finder.find_best_matches(striker)
+    first[0]['match_score'] = -1
+    second = finder.find_best_matches(striker)
+    assert (finder.memo_hits, finder.memo_misses) == (1, 1)
+    assert second[0]['match_score'] != -1
+
+    memo_size = match_finder.MATCH_MEMO_SIZE
+    match_finder.MATCH_MEMO_SIZE = 1
+    try:
+        finder.find_best_matches(winger)
+        finder.find_best_matches(striker)
+        assert (finder.memo_hits, finder.memo_misses) == (1, 3)
+    finally:
+        match_finder.MATCH_MEMO_SIZE = memo_size
+
+    finder.clear_match_memo()
+    assert finder.find_best_matches(striker) == second
+    assert (finder.memo_hits, finder.memo_misses) == (1, 4)
+    print("✅ Match memo hits, misses and eviction behave as expected.")
+
+if __name__ == "__main__":
+    test_top_k_order_matches_stable_sort()
+    for test in [test_vectorized_scores_match_scalar_scoring, test_player_ranking_pages, test_match_memo]:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            test(tmp_dir)
@@ -0,0 +1,35 @@
+# test_player_analyzer.py
+import pandas as pd
+from player_analyzer import PlayerAnalyzer, name_key
+
+def build_test_analyzer(player_count: int = 12) -> PlayerAnalyzer:
+    """A PlayerAnalyzer over a small in-memory table, enough for the row selection logic."""
+    analyzer = PlayerAnalyzer.__new__(PlayerAnalyzer)
+    analyzer.players_df = pd.DataFrame({
+        'full_name': [f"Fírst{i} Last{i}" for i in range(player_count)],
+        'position_group': ['Defender', 'Midfielder', 'Forward'] * (player_count // 3)
+    })
+    analyzer.name_index = {name_key(name): row for row, name in enumerate(analyzer.players_df['full_name'])}
+    return analyzer
+
+def test_select_players_combined():
+    """names and player_rows together select the named players that are among the given rows."""
+    analyzer = build_test_analyzer()
+
+    selected = analyzer._select_players(names=['Fírst7 Last7'], player_rows=range(5, 10))
+    assert selected['full_name'].tolist() == ['Fírst7 Last7']
+
+    # A named player outside the given rows is not selected
+    selected = analyzer._select_players(names=['Fírst2 Last2', 'First8 Last8'], player_rows=[5, 6, 8])
+    assert selected['full_name'].tolist() == ['Fírst8 Last8']
+
+    # Repeated rows are selected once
+    selected = analyzer._select_players(player_rows=[3, 3, 4])
+    assert selected.index.tolist() == [3, 4]
+
+    selected = analyzer._select_players(names=['Fírst6 Last6'], player_rows=[5, 6], position_group='Forward')
+    assert selected.empty
+    print("✅ Combined player selection returns the right rows.")
+
+if __name__ == "__main__":
+    test_select_players_combined()
@@ -0,0 +1,63 @@
+# test_talent_index.py
+import json
+import os
+import tempfile
+from match_finder import MatchFinder
+from player_analyzer import PlayerAnalyzer, POSITION_KPIS
+from talent_index import TalentIndex, index_version
+from test_match_scoring import TEST_AS_OF, build_test_finder, write_test_data
+
+def same_rows(rows: list, expected_rows: list) -> bool:
+    """Compares ranked rows as JSON, so players without a club (NaN) compare equal."""
+    return json.dumps(rows) == json.dumps(expected_rows)
+
+def test_talent_index_serves_finder_rankings(tmp_path):
+    """A saved and reloaded index serves the same pages as find_best_players_for_club."""
+    finder = build_test_finder(str(tmp_path))
+    index_path = os.path.join(str(tmp_path), 'talent_index.json')
+    TalentIndex.build(finder).save(index_path)
+
+    index = TalentIndex.load(index_path, index_version(finder), as_of=TEST_AS_OF)
+    assert index is not None
+    for club_name in finder.club_profiles:
+        for position_group in POSITION_KPIS:
+            assert same_rows(index.get(club_name, position_group), finder.find_best_players_for_club(club_name, position_group))
+            for top_k, offset in [(5, 0), (5, 5), (3, 100), (0, 0)]:
+                assert same_rows(index.get(club_name, position_group, top_k=top_k, offset=offset),
+                                 finder.find_best_players_for_club(club_name, position_group, top_k=top_k, offset=offset))
+    assert index.get("Unknown Club", "Forward") == []
+    print("✅ Talent index pages equal the finder's rankings.")
+
+def test_talent_index_versions(tmp_path):
+    """Stale, corrupt and missing index files are not loaded; load_or_build replaces them."""
+    finder = build_test_finder(str(tmp_path))
+    index_path = os.path.join(str(tmp_path), 'talent_index.json')
+    assert TalentIndex.load(index_path, index_version(finder)) is None
+
+    TalentIndex.load_or_build(finder, index_path)
+    assert TalentIndex.load(index_path, index_version(finder)) is not None
+    assert TalentIndex.load(index_path, 'another version') is None
+
+    for corrupt_contents in ['{"version": ', '[]', '{"rankings": {}}']:
+        with open(index_path, 'w', encoding='utf-8') as f:
+            f.write(corrupt_contents)
+        assert TalentIndex.load(index_path, index_version(finder)) is None
+    index = TalentIndex.load_or_build(finder, index_path)
+    with open(index_path, 'r', encoding='utf-8') as f:
+        assert json.load(f)["version"] == index.version == index_version(finder)
+    print("✅ Only an index built from the same data is loaded.")
+
+def test_index_version_follows_the_data(tmp_path):
+    """Changing the player data changes the index version; the reference date does not."""
+    stats_path, physical_path, profiles_path = write_test_data(str(tmp_path))
+    version = index_version(MatchFinder(profiles_path, PlayerAnalyzer(stats_path, physical_path, as_of=TEST_AS_OF)))
+    assert index_version(MatchFinder(profiles_path, PlayerAnalyzer(stats_path, physical_path, as_of='2026-01-01'))) == version
+
+    write_test_data(str(tmp_path), seed=8)
+    assert index_version(MatchFinder(profiles_path, PlayerAnalyzer(stats_path, physical_path, as_of=TEST_AS_OF))) != version
+    print("✅ Index versions follow the player data only.")
+
+if __name__ == "__main__":
+    for test in [test_talent_index_serves_finder_rankings, test_talent_index_versions, test_index_version_follows_the_data]:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            test(tmp_dir)
@@ -2,46 +2,124 @@
 
 import pandas as pd
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from data_cache import read_csv_cached
+from schema import SCHEMA_DTYPES, available_columns, compact_frame
+
+# Files to load per (league, season), relative to the data folder.
+# Each entry is exposed on the loader as <name>_df; add a line here to load another source.
+DATASET_MANIFEST = {
+    ("Romanian Superliga", "2024-2025"): {
+        "teams": "raw/Superliga_Teams_24_25_with_promoted.csv",
+        "players": "processed/players_manually_enriched.csv",
+        "formations": "raw/superliga_formations_24_25.csv",
+        "transfer_balance": "processed/superliga_transfer_balances.csv",
+        "raw_players": "raw/Romania_Superliga_Players_24_25_adv_stats.csv"
+    }
+}
+
+class LazyDataset:
+    """
+    A loader attribute (e.g. teams_df) that reads its file from the manifest on first access
+    and keeps it. Assigning to the attribute replaces the loaded frame.
+    """
+    def __set_name__(self, owner, attribute_name):
+        self.name = attribute_name.removesuffix('_df')
+
+    def __get__(self, loader, owner=None):
+        if loader is None:
+            return self
+        if self.name not in loader._frames:
+            with loader._load_lock:
+                if self.name not in loader._frames:
+                    loader._frames[self.name] = loader._load_dataset(self.name)
+        return loader._frames[self.name]
+
+    def __set__(self, loader, df):
+        loader._frames[self.name] = df
 
 class WyscoutDataLoader:
-    def __init__(self, data_folder_path: str):
+    teams_df = LazyDataset()
+    players_df = LazyDataset()
+    formations_df = LazyDataset()  # This will now hold both formation and status
+    transfer_balance_df = LazyDataset()
+    raw_players_df = LazyDataset()  # Unprocessed player export, used to tell contracted from departed players
+
+    def __init__(self, data_folder_path: str, use_cache: bool = False, league: str = "Romanian Superliga", season: str = "2024-2025", columns: dict | None = None):
+        """
+        Datasets are loaded lazily, the first time each <name>_df attribute is used.
+        columns optionally restricts datasets to the columns a consumer needs, e.g. {"teams": ["team.name"]}.
+        """
         if not os.path.isdir(data_folder_path):
             raise FileNotFoundError(f"The specified data folder does not exist: {data_folder_path}")
         
         self.base_path = data_folder_path
-        self.teams_df = None
-        self.players_df = None
-        self.formations_df = None  # This will now hold both formation and status
-        self.transfer_balance_df = None
+        # With use_cache, parsed CSVs are kept as columnar files under <data>/cache
+        self.cache_dir = os.path.join(data_folder_path, 'cache') if use_cache else None
+        self.league = league
+        self.season = season
+        self.columns = columns or {}
+        self.load_timings = {}
+        self._frames = {}
+        self._load_lock = threading.RLock()
         
         print("WyscoutDataLoader initialized.")
 
+    def read_csv(self, relative_path: str, **read_csv_kwargs) -> pd.DataFrame:
+        """Reads a CSV under the data folder, through the columnar cache when it is enabled."""
+        path = os.path.join(self.base_path, relative_path)
+        if self.cache_dir:
+            return read_csv_cached(path, cache_dir=self.cache_dir, **read_csv_kwargs)
+        return pd.read_csv(path, **read_csv_kwargs)
+
+    def _load_dataset(self, name: str, verbose: bool = True) -> pd.DataFrame | None:
+        """Reads one manifest entry with its requested columns in the compact schema, timing the read."""
+        relative_path = DATASET_MANIFEST[(self.league, self.season)].get(name)
+        if relative_path is None:
+            return None
+
+        start = time.perf_counter()
+        # Only the requested columns that exist in the file (all of them if none were requested)
+        usecols = available_columns(os.path.join(self.base_path, relative_path), self.columns[name]) if name in self.columns else None
+        df = compact_frame(self.read_csv(relative_path, usecols=usecols, dtype=SCHEMA_DTYPES))
+        self.load_timings[name] = time.perf_counter() - start
+        if verbose:
+            self._report_load(name, df)
+        return df
+
+    def _report_load(self, name: str, df: pd.DataFrame | None):
+        if df is not None:
+            print(f"  - Loaded {name} ({len(df)} rows) in {self.load_timings[name]:.2f}s")
+
+    def load_league_data(self, league: str, season: str, max_workers: int | None = None) -> bool:
+        """
+        Loads every file in the manifest for a league and season up front, concurrently.
+        pandas' C parser releases the GIL, so the files are parsed in parallel threads.
+        """
+        files_to_load = DATASET_MANIFEST[(league, season)]
+        start = time.perf_counter()
+
+        with self._load_lock:
+            self.league, self.season = league, season
+            self._frames = {}
+            with ThreadPoolExecutor(max_workers=max_workers or len(files_to_load)) as pool:
+                futures = {name: pool.submit(self._load_dataset, name, verbose=False) for name in files_to_load}
+
+            try:
+                for name, future in futures.items():
+                    self._frames[name] = future.result()
+                    self._report_load(name, self._frames[name])
+            except FileNotFoundError as e:
+                print(f"❌ ERROR: A data file was not found. Details: {e}")
+                return False
+
+        print(f"✅ All {league} {season} data loaded in {time.perf_counter() - start:.2f}s.")
+        return True
+
     def load_romanian_superliga_data(self) -> bool:
         """
         Loads all necessary CSV files for the Romanian Superliga analysis.
         """
-        files_to_load = {
-            "teams": "raw/Superliga_Teams_24_25_with_promoted.csv",
-            "players": "processed/players_manually_enriched.csv",
-            "formations": "raw/superliga_formations_24_25.csv",
-            "transfer_balance": "processed/superliga_transfer_balances.csv"
-        }
-
-        try:
-            teams_path = os.path.join(self.base_path, files_to_load['teams'])
-            self.teams_df = pd.read_csv(teams_path)
-
-            players_path = os.path.join(self.base_path, files_to_load['players'])
-            self.players_df = pd.read_csv(players_path)
-            
-            formations_path = os.path.join(self.base_path, files_to_load['formations'])
-            self.formations_df = pd.read_csv(formations_path)
-
-            balance_path = os.path.join(self.base_path, files_to_load['transfer_balance'])
-            self.transfer_balance_df = pd.read_csv(balance_path)
-            
-            print("✅ All Superliga data (teams, players, formations with status) loaded successfully.")
-            return True
-        except FileNotFoundError as e:
-            print(f"❌ ERROR: A data file was not found. Details: {e}")
-            return False
\ No newline at end of file
+        return self.load_league_data("Romanian Superliga", "2024-2025")